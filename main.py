@@ -11,7 +11,6 @@ from src.config import AppConfig
 from src.cli import parse_arguments
 from src.log_manager import LogManager
 from src.logging_config import configure_scrape_logging, configure_tqdm_logging
-from src.pipeline_factory import PipelineFactory
 
 
 def main() -> None:
@@ -44,6 +43,9 @@ def main() -> None:
     # Execute command
     try:
         if args.command in ["scrape", "prepare", "retry", "export"]:
+            # Imported here so "mlx" and --help don't load the LLM/git/HTTP stack
+            from src.pipeline_factory import PipelineFactory
+
             # Initialize pipeline using factory only for pipeline commands
             factory = PipelineFactory(config)
             repos_dir = str(Path(config.BASE_DIR) / config.REPOS_DIR_NAME)
@@ -92,7 +94,22 @@ def main() -> None:
             elif args.mlx_command == "download":
                 manager.download_model(args.model_name)
             elif args.mlx_command == "remove":
-                manager.remove_model(args.model_name)
+                info = manager.get_model_info(args.model_name)
+                if not info or not info.get("cached", False):
+                    print(f"Model {args.model_name} not found in local cache.")
+                else:
+                    # Confirm before deletion
+                    print(f"About to delete model: {info['name']}")
+                    print(f"Location: {info['path']}")
+                    print(f"Size: {info['size']}")
+
+                    confirm = input(
+                        "Are you sure you want to delete this model? (yes/no): "
+                    )
+                    if confirm.lower() in ["yes", "y"]:
+                        manager.remove_model(args.model_name, confirm=True)
+                    else:
+                        print("Deletion cancelled.")
             elif args.mlx_command == "info":
                 info = manager.get_model_info(args.model_name)
                 if info:
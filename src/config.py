@@ -1,8 +1,22 @@
 # src/config.py
 import os
+import platform
 from typing import Optional
 
 
+def _check_apple_silicon() -> bool:
+    """Check if running on Apple Silicon."""
+    machine = platform.machine()
+    system = platform.system()
+    return system == "Darwin" and (
+        "arm" in machine or "ARM" in machine or "aarch64" in machine
+    )
+
+
+# The platform can't change while running, so probe it once at import time
+IS_APPLE_SILICON: bool = _check_apple_silicon()
+
+
 class AppConfig:
     # --- LLM Client Settings ---
     LLM_BASE_URL: str = "http://localhost:11454"  # llama.cpp server port
@@ -11,7 +25,11 @@ class AppConfig:
     )
     LLM_MAX_RETRIES: int = 3
     LLM_RETRY_DELAY: int = 5  # seconds
+    LLM_MAX_RETRY_DELAY: int = 30  # Cap for exponential retry backoff (seconds)
+    LLM_RETRY_TIME_BUDGET: int = 120  # Max total backoff between a request's retries (seconds)
     LLM_MODEL_CACHE_TTL: int = 300  # 5 minutes
+    LLM_MODEL_NEGATIVE_CACHE_TTL: int = 5  # How long a failed model fetch is remembered (seconds)
+    LLM_USE_HTTP2: bool = True  # Negotiated via ALPN; needs the optional h2 package
 
     # --- Data Pipeline Settings ---
     BASE_DIR: str = "."
@@ -33,6 +51,7 @@ class AppConfig:
     BATTERY_LOW_THRESHOLD: int = 15  # Pause processing below this %
     BATTERY_HIGH_THRESHOLD: int = 90  # Resume processing above this %
     BATTERY_CHECK_INTERVAL: int = 60  # Check every 60 seconds when paused
+    BATTERY_POLL_INTERVAL: int = 5  # Seconds between battery checks while running
 
     # --- File Filtering Settings ---
     EXCLUDED_FILE_EXTENSIONS: tuple = (
@@ -90,19 +109,14 @@ class AppConfig:
     FILE_HASH_CACHE_SIZE: int = 10000  # Number of file hashes to cache in memory
     DATABASE_CONNECTION_POOL_SIZE: int = 5  # Size of database connection pool
     LLM_REQUEST_TIMEOUT: int = 300  # Timeout for LLM requests in seconds
+    LLM_MAX_CONNECTIONS: int = 128  # Connection pool size of the shared LLM HTTP client
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 64  # Idle connections kept open for reuse
+    LLM_MAX_CONCURRENCY: int = 8  # Answer requests in flight at once per LLM client
+    LLM_BATCH_CONCURRENCY: int = 1  # Answers of one file requested at once (1 streams them in turn)
     CHUNK_READ_SIZE: int = 8192  # Size of chunks to read files in (bytes)
 
     def __init__(self):
-        # Detect if running on Apple Silicon and enable MLX accordingly
-        import platform
-
-        machine = platform.machine()
-        system = platform.system()
-        is_apple_silicon = system == "Darwin" and (
-            "arm" in machine or "ARM" in machine or "aarch64" in machine
-        )
-
-        # Set the instance attributes based on platform detection
+        # Platform detection happens once at import time (see IS_APPLE_SILICON)
         self.USE_MLX: bool = (
             False  # Manually set to False to use llama.cpp instead of MLX
         )
@@ -110,8 +124,14 @@ class AppConfig:
             "mlx-community/Qwen2.5-Coder-14B-Instruct-4bit"  # Recommended coder model
         )
         self.MLX_MAX_RAM_GB: int = 32  # Max RAM to use for MLX models
+        self.MLX_CACHE_LIMIT_GB: int = 4  # Freed Metal buffers MLX may keep for reuse
+        self.MLX_WIRE_WEIGHTS: bool = True  # Keep model weights resident in memory
         self.MLX_QUANTIZE: bool = True  # Whether to quantize models
         self.MLX_TEMPERATURE: float = 0.7  # Default temperature for MLX generation
+        self.MLX_MAX_CONTENT_LENGTH: int = (
+            2048  # Max characters of content/context passed into a prompt
+        )
+        self.MLX_BATCH_SIZE: int = 8  # Prompts per batched MLX generate call
 
     @property
     def REPOS_DIR(self) -> str:
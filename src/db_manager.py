@@ -60,6 +60,21 @@ class DBManager:
             file_path, question_text, answer_text
         )
 
+    def add_qa_samples(
+        self, file_path: str, qa_pairs: list[tuple[str, str]]
+    ) -> list[int]:
+        """
+        Add several Q&A samples from one file in a single transaction.
+
+        Args:
+            file_path: Source file path for the Q&As
+            qa_pairs: (question_text, answer_text) tuples
+
+        Returns:
+            The sample_ids of the created samples, in input order
+        """
+        return self.training_data_repo.add_qa_samples(file_path, qa_pairs)
+
     def get_processed_question_hashes(self, file_path: str) -> set[str]:
         """
         Get hashes of all processed questions for a file.
@@ -2,7 +2,26 @@ import json
 import logging
 import httpx
 import asyncio
+import email.utils
+import random
+import re
+import socket
 import time
+from typing import AsyncIterator
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from src.config import AppConfig
 from src.protocols import LLMInterface
@@ -10,6 +29,129 @@ from src.protocols import LLMInterface
 # Initialize config instance
 config = AppConfig()
 
+# HTTP/2 lets concurrent answer requests share one connection to the server
+USE_HTTP2 = config.LLM_USE_HTTP2 and HTTP2_AVAILABLE
+
+# orjson parses the many small SSE chunks several times faster than json.
+# Its JSONDecodeError subclasses json.JSONDecodeError, so handlers stay the same.
+parse_json = orjson.loads if ORJSON_AVAILABLE else json.loads
+# Used for the rare frames holding partial or several JSON objects
+JSON_DECODER = json.JSONDecoder()
+
+# The model list is small, so fail fast instead of using the generation timeout
+MODEL_LIST_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+# Keep long-lived generation connections from being dropped while idle
+STREAM_SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+SSE_DATA_PREFIX = b"data: "
+SSE_DATA_PREFIX_LEN = len(SSE_DATA_PREFIX)
+SSE_DONE = b"[DONE]"
+
+# A generated line ending in "?", without surrounding whitespace. [^\S\n]
+# matches any whitespace except newline, the same set str.strip() removes.
+QUESTION_LINE_PATTERN = re.compile(r"^[^\S\n]*(.*\?)[^\S\n]*$", re.MULTILINE)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+STREAM_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "text/event-stream",
+    "Cache-Control": "no-cache",
+}
+
+# Client errors that mean "try again later" rather than "this request is wrong"
+RETRYABLE_STATUS_CODES = frozenset({408, 429})
+
+
+async def iter_sse_data(response: httpx.Response):
+    """Yield the payload of each SSE "data:" line as stripped bytes.
+
+    Lines are split out of the raw byte stream directly, skipping the
+    per-line text decoding that aiter_lines() does.
+    """
+    buffer = bytearray()
+    async for chunk in response.aiter_bytes():
+        buffer += chunk
+        start = 0
+        while (newline := buffer.find(b"\n", start)) != -1:
+            if buffer.startswith(SSE_DATA_PREFIX, start):
+                yield bytes(buffer[start + SSE_DATA_PREFIX_LEN : newline]).strip()
+            start = newline + 1
+        del buffer[:start]
+    # A final line without a trailing newline
+    if buffer.startswith(SSE_DATA_PREFIX):
+        yield bytes(buffer[SSE_DATA_PREFIX_LEN:]).strip()
+
+
+def decode_json_objects(text: str) -> tuple[list, str]:
+    """Decode every complete JSON value in text.
+
+    Returns the decoded values and the undecoded remainder, which is either
+    the start of a value that continues in a later data line or malformed.
+    """
+    objects = []
+    pos = 0
+    end = len(text)
+    while pos < end:
+        try:
+            obj, pos = JSON_DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        objects.append(obj)
+        while pos < end and text[pos].isspace():
+            pos += 1
+    return objects, text[pos:]
+
+
+def resume_json_objects(pending: str, chunk: bytes) -> tuple[list, str]:
+    """Continue decoding pending text with the next data line.
+
+    If the combined text still doesn't decode but the new line does on its
+    own, the pending text was malformed rather than incomplete and is dropped.
+    """
+    text = chunk.decode("utf-8", "replace")
+    objects, rest = decode_json_objects(pending + text)
+    if not objects:
+        fresh, fresh_rest = decode_json_objects(text)
+        if fresh:
+            logging.warning("Failed to decode JSON chunk: %r", pending)
+            return fresh, fresh_rest
+    return objects, rest
+
+
+def extract_delta(data) -> str | None:
+    """Return the generated text carried by one streamed completion chunk."""
+    # Fast path for the usual OpenAI-style token delta
+    try:
+        return data["choices"][0]["delta"]["content"]
+    except (KeyError, IndexError, TypeError):
+        pass
+    choices = data.get("choices") if isinstance(data, dict) else None
+    if not choices:
+        # e.g. trailing usage-only chunks
+        return None
+    choice = choices[0]
+    if "delta" in choice:
+        return choice["delta"].get("content")
+    # Some servers send whole-message chunks instead of per-token deltas
+    return choice.get("message", {}).get("content")
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Return the wait a Retry-After header asks for, in seconds, if it has one."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # The header may also be an HTTP date
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
 
 class LLMClient(LLMInterface):
     """LLM client with caching and retry logic for OpenAI-compatible APIs."""
@@ -17,7 +159,37 @@ class LLMClient(LLMInterface):
     # Class-level cache for model list
     _model_cache: list[str] | None = None
     _model_cache_time: float | None = None
+    _model_cache_base_url: str | None = None
     _model_cache_ttl: int = config.LLM_MODEL_CACHE_TTL
+    _model_cache_negative_ttl: int = config.LLM_MODEL_NEGATIVE_CACHE_TTL
+
+    # System prompts are built once instead of on every request
+    _QUESTIONS_SYSTEM_PROMPT = """
+        You are an expert data generation engine tasked with creating a high-quality,
+        diverse dataset for fine-tuning a powerful Code Large Language Model. Your goal
+        is to generate as many unique, challenging, and highly relevant questions as
+        possible *strictly about the provided code/text*. Each question must be answerable
+        *solely and directly from the content of the 'Code/Text to analyze'*. Prioritize
+        understanding this specific code/text rather than general knowledge or external
+        contexts. While topics like CI/CD, Kubernetes, cloud-native technologies,
+        infrastructure as code, related DevOps practices, shell scripting, and automation
+        are relevant, questions about them should ONLY be asked if they are *explicitly
+        present or strongly implied* within the given code/text. Do NOT generate questions
+        that require external knowledge not explicitly present or directly inferable from
+        the provided text. Vary the complexity of questions. Include some simple Q&A, some
+        medium-difficulty concepts, and at least two complex tasks. Ensure no two questions
+        are too similar in topic. Output ONLY the questions, one per line, with no preamble,
+        explanations, or text outside the question list.
+        """.strip()
+
+    _ANSWER_SYSTEM_PROMPT = """
+        You are a highly intelligent AI assistant specializing in code analysis and
+        comprehension. Answer the following question, leveraging both the provided context
+        and your broader knowledge base. Prioritize information from the context, but use
+        your general knowledge to provide a comprehensive answer if the context is
+        insufficient. If the context directly contradicts your broader knowledge, use the
+        context's information.
+        """.strip()
 
     def __init__(
         self,
@@ -30,46 +202,73 @@ class LLMClient(LLMInterface):
         self.model_name = model_name
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        # Shared HTTP client, created lazily inside the event loop that uses it
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        # Model discovery runs once, on the loop that makes the first request
+        self._ready = asyncio.Event()
+        # The discovery lock and request semaphore are bound to one event loop
+        # too, so they are (re)made for whichever loop is running
+        self._max_concurrency = config.LLM_MAX_CONCURRENCY
+        self._ready_lock: asyncio.Lock | None = None
+        self._request_semaphore: asyncio.Semaphore | None = None
+        self._primitives_loop: asyncio.AbstractEventLoop | None = None
         logging.info(
-            f"LLMClient initialized. Using model: {self.model_name} at {base_url}"
+            "LLMClient initialized. Using model: %s at %s",
+            self.model_name,
+            base_url,
         )
 
-        try:
-            # Call async method from sync __init__ using asyncio.run for initial check
-            logging.info("Calling _get_available_llm_models_sync_wrapper in __init__.")
-            available_models = asyncio.run(
-                self._get_available_llm_models_sync_wrapper()
-            )
-            logging.info(
-                f"Finished _get_available_llm_models_sync_wrapper in __init__. Found models: {available_models}"
-            )
-        except Exception as e:
-            logging.critical(
-                f"An unexpected error occurred during initial model fetch: {e}",
-                exc_info=True,
+    async def ensure_ready(self) -> None:
+        """Fetch the server's model list and settle on a model, once.
+
+        Discovery uses the shared HTTP client, so its connection is reused by
+        the first chat request. Raises ValueError if no usable model exists.
+        """
+        self._bind_to_running_loop()
+        if self._ready.is_set():
+            return
+        async with self._ready_lock:
+            if self._ready.is_set():
+                return
+            available_models = await self._get_available_llm_models(
+                await self._ensure_client()
             )
-            available_models = []
+            logging.info("Initial model fetch found models: %s", available_models)
+            self._select_model(available_models)
+            self._ready.set()
 
+    def _bind_to_running_loop(self) -> None:
+        """Create the asyncio lock and semaphore for the running event loop.
+
+        Like the HTTP client, they can't be shared between loops, so new ones
+        are made when a client is reused under a later asyncio.run().
+        """
+        loop = asyncio.get_running_loop()
+        if self._primitives_loop is not loop:
+            self._ready_lock = asyncio.Lock()
+            self._request_semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._primitives_loop = loop
+
+    def _select_model(self, available_models: list[str]) -> None:
+        """Check the configured model against the server's list, falling back if needed."""
         if available_models:
             if self.model_name in available_models:
-                logging.info(f"Using specified model: {self.model_name}")
+                logging.info("Using specified model: %s", self.model_name)
             else:
                 logging.warning(
-                    f"Specified model '{self.model_name}' not found on the LLM server."
+                    "Specified model '%s' not found on the LLM server.",
+                    self.model_name,
+                )
+                logging.info("Available models: %s", ", ".join(available_models))
+                # Fallback to the first available model
+                original_model_name = self.model_name
+                self.model_name = available_models[0]
+                logging.info(
+                    "Requested model '%s' not found. Falling back to first available model: %s",
+                    original_model_name,
+                    self.model_name,
                 )
-                logging.info(f"Available models: {', '.join(available_models)}")
-                if available_models:
-                    # Fallback to the first available model
-                    original_model_name = self.model_name
-                    self.model_name = available_models[0]
-                    logging.info(
-                        f"Requested model '{original_model_name}' not found. Falling back to first available model: {self.model_name}"
-                    )
-                else:
-                    logging.critical(
-                        "No models available on the LLM server. Please load a model."
-                    )
-                    self.model_name = None  # Indicate no usable model
         else:
             logging.critical(
                 "Could not connect to LLM server or retrieve model list. Please ensure the server is running."
@@ -85,13 +284,6 @@ class LLMClient(LLMInterface):
             )
         logging.info("LLMClient successfully initialized with a usable model.")
 
-    async def _get_available_llm_models_sync_wrapper(self) -> list[str]:
-        """Wrapper to manage async client lifecycle."""
-        # Set a default timeout for the client to cover connection, read, and write
-        timeout = httpx.Timeout(30.0, connect=10.0)  # 10s for connect, 30s total
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            return await self._get_available_llm_models(client)
-
     async def _get_available_llm_models(self, client: httpx.AsyncClient) -> list[str]:
         """Fetch available models with caching."""
         logging.info("Attempting to get available LLM models.")
@@ -100,147 +292,301 @@ class LLMClient(LLMInterface):
         if (
             LLMClient._model_cache is not None
             and LLMClient._model_cache_time is not None
-            and (current_time - LLMClient._model_cache_time)
-            < LLMClient._model_cache_ttl
+            and LLMClient._model_cache_base_url == self.base_url
         ):
-            logging.debug("Using cached model list")
-            return LLMClient._model_cache
+            cache_age = current_time - LLMClient._model_cache_time
+            if LLMClient._model_cache:
+                if cache_age < LLMClient._model_cache_ttl:
+                    logging.debug("Using cached model list")
+                    return LLMClient._model_cache
+            elif cache_age < LLMClient._model_cache_negative_ttl:
+                # A fetch just failed; don't hammer a server that is restarting
+                logging.warning(
+                    "Model list fetch from %s failed %.1fs ago, not retrying yet.",
+                    self.base_url,
+                    cache_age,
+                )
+                return []
 
         models_api_url = f"{self.base_url}/v1/models"
         try:
-            logging.info(f"Sending GET request to {models_api_url} for model list.")
-            response = await client.get(
-                models_api_url
-            )  # Timeout is now handled by the client instance
+            logging.info("Sending GET request to %s for model list.", models_api_url)
+            response = await client.get(models_api_url, timeout=MODEL_LIST_TIMEOUT)
             logging.info(
-                f"Received response from {models_api_url}. Status: {response.status_code}"
+                "Received response from %s. Status: %s",
+                models_api_url,
+                response.status_code,
             )
             response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx)
             models_data = response.json()
-            logging.info(f"Raw models response from server: {models_data}")
+            logging.info("Raw models response from server: %s", models_data)
             # Assuming OpenAI-compatible API response structure: {"data": [{"id": "model_name", ...}]}
             models = [m["id"] for m in models_data.get("data", [])]
 
             # Update cache
-            LLMClient._model_cache = models
-            LLMClient._model_cache_time = current_time
+            self._cache_model_list(models, current_time)
 
-            logging.info(f"Successfully retrieved and parsed model list: {models}")
+            logging.info("Successfully retrieved and parsed model list: %s", models)
             return models
         except httpx.ConnectError as e:
-            logging.error(f"Connection error to LLM server at {models_api_url}: {e}")
-            return []
+            logging.error(
+                "Connection error to LLM server at %s: %s", models_api_url, e
+            )
         except httpx.ReadTimeout:
             logging.error(
-                f"Read timeout while waiting for response from LLM server at {models_api_url}. "
-                "The server accepted the connection but did not send a complete response within the timeout period."
+                "Read timeout while waiting for response from LLM server at %s. "
+                "The server accepted the connection but did not send a complete response within the timeout period.",
+                models_api_url,
             )
-            return []
         except httpx.RequestError as e:  # Catch all other httpx request errors
             logging.error(
-                f"Failed to retrieve LLM model list from {models_api_url}: {e}"
+                "Failed to retrieve LLM model list from %s: %s",
+                models_api_url,
+                e,
             )
-            return []
         except json.JSONDecodeError:
             logging.error(
-                f"Failed to decode JSON from LLM server at {models_api_url}. Response: {response.text[:200]}..."
+                "Failed to decode JSON from LLM server at %s. Response: %s...",
+                models_api_url,
+                response.text[:200],
             )
-            return []
         except Exception as e:
-            logging.error(f"An unexpected error occurred while getting model list: {e}")
-            return []
+            logging.error(
+                "An unexpected error occurred while getting model list: %s", e
+            )
 
-    async def _call_llm_api(
+        # Remember the failure too, so clients created right after this one
+        # don't each wait out another timeout
+        self._cache_model_list([], current_time)
+        return []
+
+    def _cache_model_list(self, models: list[str], fetched_at: float) -> None:
+        """Store a model list (empty after a failed fetch) in the class cache."""
+        LLMClient._model_cache = models
+        LLMClient._model_cache_time = fetched_at
+        LLMClient._model_cache_base_url = self.base_url
+
+    async def _ensure_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use.
+
+        Connections are pooled and reused across calls. A client is bound to
+        the event loop it was created in, so a new one is made if the running
+        loop has changed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            transport = httpx.AsyncHTTPTransport(
+                http2=USE_HTTP2,
+                socket_options=STREAM_SOCKET_OPTIONS,
+                limits=httpx.Limits(
+                    max_connections=config.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+            self._client = httpx.AsyncClient(
+                transport=transport, timeout=config.LLM_REQUEST_TIMEOUT
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        client, self._client = self._client, None
+        self._client_loop = None
+        if client is not None:
+            await client.aclose()
+
+    def _get_retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, capped at LLM_MAX_RETRY_DELAY."""
+        backoff = min(config.LLM_MAX_RETRY_DELAY, self.retry_delay * (2**attempt))
+        return backoff * (0.5 + random.random() * 0.5)
+
+    def _next_retry_delay(
+        self, attempt: int, slept: float, retry_after: float | None = None
+    ) -> float | None:
+        """Delay before the next attempt, or None once retries or time run out.
+
+        ``slept`` is the backoff already waited for this request. Only those
+        waits count against LLM_RETRY_TIME_BUDGET, so a slow attempt that
+        times out still gets retried.
+
+        A server-requested ``retry_after`` wait is honoured when it is longer
+        than the backoff.
+        """
+        if attempt >= self.max_retries - 1:
+            return None
+        delay = self._get_retry_delay(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if slept + delay > config.LLM_RETRY_TIME_BUDGET:
+            return None
+        return delay
+
+    def _build_payload(
         self,
         messages: list[dict[str, str]],
         options: dict[str, int | float],
-        function_name: str,
-        pbar: "tqdm | None" = None,
-    ) -> dict[str, any] | None:
-        """Call LLM API with retry logic and streaming."""
-        chat_completions_url = f"{self.base_url}/v1/chat/completions"
-        headers = {"Content-Type": "application/json"}
-        payload = {
+        stream: bool,
+    ) -> dict:
+        """Build the chat completions request body."""
+        return {
             "model": self.model_name,
             "messages": messages,
             "temperature": options.get("temperature", 0.7),
             "max_tokens": options.get("max_tokens", 500),
-            "stream": True,  # Enable streaming
+            "stream": stream,
         }
 
-        full_response = ""
-        async with httpx.AsyncClient() as client:
-            for attempt in range(self.max_retries):
-                try:
+    async def _iter_stream_deltas(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: dict[str, str],
+        payload: dict,
+    ) -> AsyncIterator[str]:
+        """POST a streaming completion request and yield text deltas as they arrive."""
+        async with client.stream("POST", url, headers=headers, json=payload) as response:
+            response.raise_for_status()
+            # Text of a JSON object split across several data lines
+            pending = ""
+            async for chunk in iter_sse_data(response):
+                if not chunk or chunk == SSE_DONE:
+                    continue
+
+                if pending:
+                    objects, pending = resume_json_objects(pending, chunk)
+                else:
+                    try:
+                        objects = [parse_json(chunk)]
+                    except json.JSONDecodeError:
+                        # Split or concatenated objects: decode incrementally
+                        objects, pending = decode_json_objects(
+                            chunk.decode("utf-8", "replace")
+                        )
+
+                for data in objects:
+                    delta = extract_delta(data)
+                    if delta:
+                        yield delta
+            if pending:
+                logging.warning("Failed to decode JSON chunk: %r", pending)
+
+    async def _call_llm_api(
+        self,
+        messages: list[dict[str, str]],
+        options: dict[str, int | float],
+        function_name: str,
+        pbar: "tqdm | None" = None,
+        stream: bool = True,
+    ) -> dict[str, any] | None:
+        """Call LLM API with retry logic and optional streaming.
+
+        Non-interactive callers can pass ``stream=False`` to fetch the whole
+        completion in a single response instead of parsing SSE chunks.
+        """
+        chat_completions_url = f"{self.base_url}/v1/chat/completions"
+        headers = STREAM_HEADERS if stream else JSON_HEADERS
+        payload = self._build_payload(messages, options, stream)
+
+        response_parts: list[str] = []
+        client = await self._ensure_client()
+        slept = 0.0
+        for attempt in range(self.max_retries):
+            # Drop any text a failed attempt streamed before it broke off
+            response_parts.clear()
+            try:
+                # Serializing the payload costs as much as the prompt is long,
+                # so skip it entirely when INFO records would be dropped
+                if logging.getLogger().isEnabledFor(logging.INFO):
                     logging.info(
-                        f"Attempt {attempt + 1}/{self.max_retries}: Sending POST request to {chat_completions_url} with payload: {json.dumps(payload)}"
+                        "Attempt %s/%s: Sending POST request to %s with payload: %s",
+                        attempt + 1,
+                        self.max_retries,
+                        chat_completions_url,
+                        json.dumps(payload),
                     )
-                    async with client.stream(
-                        "POST",
+                if not stream:
+                    response = await client.post(
                         chat_completions_url,
                         headers=headers,
                         json=payload,
-                        timeout=300,
-                    ) as response:
-                        response.raise_for_status()
-                        async for line in response.aiter_lines():
-                            if line:
-                                try:
-                                    if line.startswith("data: "):
-                                        chunk_str = line[6:].strip()
-                                        if chunk_str == "[DONE]":
-                                            continue
-                                        if not chunk_str:
-                                            continue
-
-                                        data = json.loads(chunk_str)
-                                        delta = (
-                                            data.get("choices", [{}])[0]
-                                            .get("delta", {})
-                                            .get("content", "")
-                                        )
-                                        if delta:
-                                            full_response += delta
-                                except json.JSONDecodeError:
-                                    logging.warning(
-                                        f"Failed to decode JSON chunk: {line}"
-                                    )
-                                    continue
-                                except Exception as e:
-                                    logging.error(f"Error processing stream chunk: {e}")
-                                    continue
-                    # If stream completes successfully, break retry loop
-                    break
-                except (
-                    httpx.ConnectError,
-                    httpx.TimeoutException,
-                    httpx.RequestError,
-                ) as e:
-                    logging.error(
-                        f"LLM API error during {function_name} (Attempt {attempt + 1}/{self.max_retries}): {e}"
                     )
-                    if attempt < self.max_retries - 1:
-                        await asyncio.sleep(self.retry_delay)
-                    else:
-                        logging.error(
-                            f"Failed to complete {function_name} after {self.max_retries} attempts."
-                        )
-                        return None
-                except Exception as e:
+                    response.raise_for_status()
+                    content = response.json()["choices"][0]["message"].get("content")
+                    if content:
+                        response_parts.append(content)
+                    break
+                append_part = response_parts.append
+                async for delta in self._iter_stream_deltas(
+                    client, chat_completions_url, headers, payload
+                ):
+                    append_part(delta)
+                # If stream completes successfully, break retry loop
+                break
+            except httpx.HTTPStatusError as e:
+                status_code = e.response.status_code
+                # Client errors (bad payload, unknown model) won't succeed on retry
+                if status_code < 500 and status_code not in RETRYABLE_STATUS_CODES:
+                    logging.error("LLM API rejected %s request: %s", function_name, e)
+                    return None
+                logging.error(
+                    "LLM API error during %s (Attempt %s/%s): %s",
+                    function_name,
+                    attempt + 1,
+                    self.max_retries,
+                    e,
+                )
+                delay = self._next_retry_delay(
+                    attempt, slept, retry_after_seconds(e.response)
+                )
+                if delay is None:
+                    return None
+                await asyncio.sleep(delay)
+                slept += delay
+            except (
+                httpx.ConnectError,
+                httpx.TimeoutException,
+                httpx.RequestError,
+            ) as e:
+                logging.error(
+                    "LLM API error during %s (Attempt %s/%s): %s",
+                    function_name,
+                    attempt + 1,
+                    self.max_retries,
+                    e,
+                )
+                delay = self._next_retry_delay(attempt, slept)
+                if delay is None:
                     logging.error(
-                        f"An unexpected error occurred during {function_name} stream (Attempt {attempt + 1}/{self.max_retries}): {e}"
+                        "Failed to complete %s after %s attempts.",
+                        function_name,
+                        attempt + 1,
                     )
-                    if attempt < self.max_retries - 1:
-                        await asyncio.sleep(self.retry_delay)
-                    else:
-                        return None
+                    return None
+                await asyncio.sleep(delay)
+                slept += delay
+            except Exception as e:
+                logging.error(
+                    "An unexpected error occurred during %s stream (Attempt %s/%s): %s",
+                    function_name,
+                    attempt + 1,
+                    self.max_retries,
+                    e,
+                )
+                delay = self._next_retry_delay(attempt, slept)
+                if delay is None:
+                    return None
+                await asyncio.sleep(delay)
+                slept += delay
 
+        full_response = "".join(response_parts).strip()
         if full_response:
             # Mimic the non-streaming response structure
-            return {"choices": [{"message": {"content": full_response.strip()}}]}
+            return {"choices": [{"message": {"content": full_response}}]}
         else:
             logging.warning(
-                f"LLM call for {function_name} resulted in an empty response."
+                "LLM call for %s resulted in an empty response.",
+                function_name,
             )
             return None
 
@@ -252,26 +598,9 @@ class LLMClient(LLMInterface):
         pbar: "tqdm | None" = None,
     ) -> list[str] | None:
         """Generate questions from code/text using LLM."""
-        system_prompt = """
-        You are an expert data generation engine tasked with creating a high-quality,
-        diverse dataset for fine-tuning a powerful Code Large Language Model. Your goal
-        is to generate as many unique, challenging, and highly relevant questions as
-        possible *strictly about the provided code/text*. Each question must be answerable
-        *solely and directly from the content of the 'Code/Text to analyze'*. Prioritize
-        understanding this specific code/text rather than general knowledge or external
-        contexts. While topics like CI/CD, Kubernetes, cloud-native technologies,
-        infrastructure as code, related DevOps practices, shell scripting, and automation
-        are relevant, questions about them should ONLY be asked if they are *explicitly
-        present or strongly implied* within the given code/text. Do NOT generate questions
-        that require external knowledge not explicitly present or directly inferable from
-        the provided text. Vary the complexity of questions. Include some simple Q&A, some
-        medium-difficulty concepts, and at least two complex tasks. Ensure no two questions
-        are too similar in topic. Output ONLY the questions, one per line, with no preamble,
-        explanations, or text outside the question list.
-        """.strip()
-
+        await self.ensure_ready()
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": self._QUESTIONS_SYSTEM_PROMPT},
             {"role": "user", "content": f"Code/Text to analyze:\n{text}\n\nQuestions:"},
         ]
         options = {"temperature": temperature, "max_tokens": max_tokens}
@@ -286,16 +615,25 @@ class LLMClient(LLMInterface):
             return None  # Indicate failure instead of fallback string
 
         generated_text = response_json["choices"][0]["message"]["content"]
-        questions = [
-            q.strip()
-            for q in generated_text.split("\n")
-            if q.strip() and q.strip().endswith("?")
-        ]
+        # One C-level scan: every stripped line that ends in "?"
+        questions = QUESTION_LINE_PATTERN.findall(generated_text)
         if not questions:  # Fallback if parsing fails
             logging.warning("LLM generated no valid questions.")
             return None  # Indicate failure
         return questions
 
+    def _build_answer_messages(
+        self, question: str, context: str
+    ) -> list[dict[str, str]]:
+        """Build the chat messages asking for an answer to one question."""
+        return [
+            {"role": "system", "content": self._ANSWER_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": f"Context:\n{context}\n\nQuestion: {question}\n\nAnswer:",
+            },
+        ]
+
     async def get_answer_single(
         self,
         question: str,
@@ -303,31 +641,20 @@ class LLMClient(LLMInterface):
         temperature: float,
         max_tokens: int,
         pbar: "tqdm | None" = None,
+        stream: bool = True,
     ) -> str | None:
         """Generate answer for a single question given context."""
-        system_prompt = """
-        You are a highly intelligent AI assistant specializing in code analysis and
-        comprehension. Answer the following question, leveraging both the provided context
-        and your broader knowledge base. Prioritize information from the context, but use
-        your general knowledge to provide a comprehensive answer if the context is
-        insufficient. If the context directly contradicts your broader knowledge, use the
-        context's information.
-        """.strip()
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {
-                "role": "user",
-                "content": f"Context:\n{context}\n\nQuestion: {question}\n\nAnswer:",
-            },
-        ]
+        await self.ensure_ready()
+        messages = self._build_answer_messages(question, context)
         options = {
             "temperature": temperature,
             "max_tokens": max_tokens,
         }
-        response_json = await self._call_llm_api(
-            messages, options, "get_answer_single", pbar=pbar
-        )
+        # Cap in-flight requests so large batches don't swamp the server
+        async with self._request_semaphore:
+            response_json = await self._call_llm_api(
+                messages, options, "get_answer_single", pbar=pbar, stream=stream
+            )
         if response_json is None or not response_json.get("choices"):
             logging.warning(
                 "No response or choices from LLM API for answer generation."
@@ -336,31 +663,75 @@ class LLMClient(LLMInterface):
 
         return response_json["choices"][0]["message"]["content"].strip()
 
+    async def stream_answer(
+        self,
+        question: str,
+        context: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> AsyncIterator[str]:
+        """Yield the answer to a question piece by piece as it is generated.
+
+        Unlike get_answer_single this makes a single attempt: once text has
+        been handed to the caller a retry can't take it back, so request
+        errors are raised instead of retried.
+
+        A request slot is held until the stream ends, including while the
+        caller is handling each piece. Callers that may stop early must close
+        the generator, e.g. ``async with contextlib.aclosing(...)``, or the
+        slot stays taken until it is garbage collected.
+        """
+        await self.ensure_ready()
+        options = {"temperature": temperature, "max_tokens": max_tokens}
+        payload = self._build_payload(
+            self._build_answer_messages(question, context), options, stream=True
+        )
+        client = await self._ensure_client()
+        async with self._request_semaphore:
+            async for delta in self._iter_stream_deltas(
+                client, f"{self.base_url}/v1/chat/completions", STREAM_HEADERS, payload
+            ):
+                yield delta
+
     async def get_answers_batch(
         self,
         batch_of_question_context_tuples: list[tuple[str, str]],
         temperature: float,
         max_tokens: int,
+        pbar: "tqdm | None" = None,
     ) -> list[str | None]:
-        """Generate answers for multiple questions in parallel using TaskGroup."""
+        """Generate answers for multiple questions using TaskGroup.
+
+        Up to LLM_BATCH_CONCURRENCY answers are requested at once. The default
+        of 1 answers them in turn: a single-slot server would otherwise queue
+        the rest until they hit the read timeout.
+        """
+        # Resolve the model before fanning out so errors aren't wrapped per task
+        await self.ensure_ready()
         results: list[str | None] = [None] * len(batch_of_question_context_tuples)
+        fan_out = max(1, config.LLM_BATCH_CONCURRENCY)
+        batch_slots = asyncio.Semaphore(fan_out)
+        # One request at a time streams like get_answer_single always has;
+        # concurrent answers aren't read incrementally, so skip SSE for them
+        stream = fan_out == 1
+
+        async def answer_item(i: int, question: str, context: str) -> None:
+            # Failures are caught per item so one bad answer doesn't make the
+            # TaskGroup cancel its siblings and discard the whole batch
+            try:
+                async with batch_slots:
+                    results[i] = await self.get_answer_single(
+                        question, context, temperature, max_tokens, stream=stream
+                    )
+            except Exception as e:
+                logging.error("Error processing question batch item %s: %s", i, e)
+            if pbar is not None:
+                pbar.update(1)
 
         # Python 3.14+ TaskGroup for better structured concurrency
         async with asyncio.TaskGroup() as tg:
-            tasks = []
             for i, (question, context) in enumerate(batch_of_question_context_tuples):
-                task = tg.create_task(
-                    self.get_answer_single(question, context, temperature, max_tokens)
-                )
-                tasks.append((i, task))
-
-        # Collect results
-        for i, task in tasks:
-            try:
-                results[i] = task.result()
-            except Exception as e:
-                logging.error(f"Error processing question batch item {i}: {e}")
-                results[i] = None
+                tg.create_task(answer_item(i, question, context))
 
         return results
 
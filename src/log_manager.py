@@ -2,6 +2,7 @@
 
 import os
 import datetime
+import heapq
 from pathlib import Path
 import logging
 
@@ -41,21 +42,25 @@ class LogManager:
         Args:
             max_files: Maximum number of log files to retain
         """
-        log_files = sorted(
-            [
-                f
-                for f in self.logs_dir.iterdir()
-                if f.name.startswith(self.config.LOG_FILE_PREFIX)
-                and f.name.endswith(".log")
-            ],
-            key=lambda f: f.stat().st_mtime,
-        )
+        prefix = self.config.LOG_FILE_PREFIX
+        # DirEntry caches its stat result, so each file is stat'ed once
+        with os.scandir(self.logs_dir) as entries:
+            log_files = [
+                entry
+                for entry in entries
+                if entry.name.startswith(prefix) and entry.name.endswith(".log")
+            ]
 
-        if len(log_files) >= max_files:
-            files_to_delete = log_files[: len(log_files) - max_files + 1]
-            for old_log_file in files_to_delete:
-                try:
-                    old_log_file.unlink()
-                    print(f"Deleted old log file: {old_log_file.name}")
-                except OSError as e:
-                    print(f"Error deleting old log file {old_log_file.name}: {e}")
+        # Only the oldest few go, so select them without sorting everything
+        delete_count = len(log_files) - max_files + 1
+        if delete_count <= 0:
+            return
+        files_to_delete = heapq.nsmallest(
+            delete_count, log_files, key=lambda entry: entry.stat().st_mtime
+        )
+        for old_log_file in files_to_delete:
+            try:
+                os.unlink(old_log_file.path)
+                print(f"Deleted old log file: {old_log_file.name}")
+            except OSError as e:
+                print(f"Error deleting old log file {old_log_file.name}: {e}")
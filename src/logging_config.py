@@ -1,8 +1,14 @@
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from tqdm import tqdm
 
+# Background thread that writes queued records to the log file
+_log_listener: QueueListener | None = None
+
 
 class TqdmLoggingHandler(logging.Handler):
     """A logging handler that uses tqdm.write() to avoid interfering with progress bars."""
@@ -14,13 +20,45 @@ class TqdmLoggingHandler(logging.Handler):
         try:
             msg = self.format(record)
             tqdm.write(msg, file=sys.stderr)
-            self.flush()
         except (KeyboardInterrupt, SystemExit):
             raise
         except Exception:
             self.handleError(record)
 
 
+def stop_queued_logging() -> None:
+    """Flush pending records to the log file and stop the background writer."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+
+
+atexit.register(stop_queued_logging)
+
+
+def _add_queued_file_handler(
+    root_logger: logging.Logger, file_handler: logging.Handler
+) -> None:
+    """
+    Attach file_handler to root_logger through a queue, so logging calls only
+    enqueue records and the disk writes happen on a background thread.
+    """
+    global _log_listener
+    stop_queued_logging()
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    # Don't queue records the file handler would drop anyway
+    queue_handler.setLevel(file_handler.level)
+    root_logger.addHandler(queue_handler)
+
+    _log_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _log_listener.start()
+
+
 def configure_scrape_logging(log_file_path: str | Path) -> None:
     """
     Configure logging for the scrape command with a standard console handler.
@@ -36,7 +74,7 @@ def configure_scrape_logging(log_file_path: str | Path) -> None:
     file_handler = logging.FileHandler(str(log_file_path), mode="a")
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+    _add_queued_file_handler(root_logger, file_handler)
 
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
@@ -61,7 +99,7 @@ def configure_tqdm_logging(log_file_path: str | Path) -> None:
     file_handler = logging.FileHandler(str(log_file_path), mode="a")
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
+    _add_queued_file_handler(root_logger, file_handler)
 
     # Configure the dedicated tqdm logger
     tqdm_logger = logging.getLogger("tqdm_logger")
@@ -1,14 +1,19 @@
 """MLX Client for running models natively on Apple Silicon."""
 
 import asyncio
+import concurrent.futures
 import logging
 import os
-import platform
+import re
 import threading
+import time
 from typing import List, Optional
 from pathlib import Path
 import sys
 
+from src.config import AppConfig, IS_APPLE_SILICON as ON_APPLE_SILICON
+from src.protocols import LLMInterface
+
 # Set tokenizers parallelism to avoid warnings in multiprocessing
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
@@ -16,24 +21,67 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 # This prevents the GPU command buffer conflicts while allowing other operations to run in parallel
 MLX_LOCK = threading.Lock()
 
+# A generated question: starts at a line start or right after the previous "?",
+# optionally prefixed with "Q1:", "Q:", "Question:" or "1.", and runs up to the
+# next "?" on the same line. Anchoring the start keeps the scan linear.
+QUESTION_PATTERN = re.compile(
+    r"(?:^|(?<=\?))[ \t]*(?:[Qq]\d*:|Question:|\d+\.)?[ \t]*([^?\n]+\?)",
+    re.MULTILINE,
+)
+
+
+# Static prompt text, built once at import. Dynamic content goes last so that
+# consecutive prompts share the longest possible token prefix.
+QUESTION_SYSTEM_PROMPT = "You are an expert researcher and analyst. Generate only the specific questions requested by the user. Do not include any template instructions or system messages in your response."
+QUESTION_INSTRUCTION = "Generate as many diverse, specific questions as possible about the given content that would help understand its purpose, structure, important elements, relationships, implications, and potential improvements."
+QUESTION_USER_TEMPLATE = """Analyze the meaning of the content at the end of this message and generate multiple relevant questions about it.
+
+INSTRUCTION: {instruction}
+
+Generate as many diverse, specific questions as possible to thoroughly test understanding of this content. Focus on the purpose, function, important details, format, structure, relationships, implications, context, and significance. Ask different types of questions: What does it contain? How is it structured? Why is it formatted this way? What are the key elements? What could be improved? What is the context? What are the relationships between parts? How does it relate to other concepts? What assumptions does it make? What are the implications?
+
+IMPORTANT: Return only clear, specific questions. Each question should be on its own line, formatted as "Q1: What does this content do?", "Q2: How is this organized?", etc. Do NOT include ANSWER: sections or empty code blocks like ``` in your response.
+
+CONTENT:
+```
+{content}
+```"""
+
+ANSWER_SYSTEM_PROMPT = "You are a precise question-answering expert. You will be given content and a specific question about that content. ANSWER ONLY THE QUESTION ASKED using information from the content. Never give generic answers about the content unrelated to the specific question."
+ANSWER_USER_TEMPLATE = """RESPONSE: Answer ONLY and EXACTLY the specific question at the end of this message based on the content shown. Your response must directly address what was asked in the question. If the question asks 'HOW', focus on processes/procedures. If it asks 'WHAT', focus on descriptions. If it asks 'WHY', focus on reasons/purposes. If it asks 'WHERE', focus on locations/URLs. Make sure your answer is specific to what was asked, not a general summary of the content.
+
+CONTENT FOR REFERENCE:
+```
+{content}
+```
+
+SPECIFIC QUESTION (ANSWER THIS EXACTLY): {question}"""
+
+# Stand-in for the user message while rendering a chat template once; it
+# contains no characters a template would escape or trim
+CHAT_TEMPLATE_PLACEHOLDER = "\x00USER_CONTENT\x00"
+
+
+def _normalize_content(content: str) -> str:
+    """
+    Normalize content for generation cache keys.
+    Only differences that never change meaning (line endings, trailing
+    whitespace, leading/trailing blank lines) are dropped; indentation is kept.
+    """
+    return "\n".join(line.rstrip() for line in content.strip().splitlines())
+
+
 try:
     import mlx.core as mx
     import mlx.nn as nn
+    from mlx.utils import tree_flatten
     from mlx_lm import load, generate
 
     # Only import what we actually need
     MLX_AVAILABLE = True
 
-    def _check_apple_silicon():
-        """Check if running on Apple Silicon."""
-        machine = platform.machine()
-        system = platform.system()
-        return system == "Darwin" and (
-            "arm" in machine or "ARM" in machine or "aarch64" in machine
-        )
-
-    # Check if this is Apple Silicon when module is imported (only if MLX is available)
-    IS_APPLE_SILICON = _check_apple_silicon()
+    # Platform is probed once when src.config is imported (only matters if MLX is available)
+    IS_APPLE_SILICON = ON_APPLE_SILICON
 
 except ImportError as e:
     MLX_AVAILABLE = False
@@ -42,11 +90,38 @@ except ImportError as e:
         f"MLX libraries not available. MLX client will not function. Error: {e}"
     )
 
-from src.config import AppConfig
-from src.protocols import LLMInterface
+# Reusable KV caches let consecutive prompts skip re-prefilling a shared prefix.
+# Older mlx-lm releases don't ship the cache helpers, so treat them as optional.
+try:
+    from mlx_lm.models.cache import (
+        can_trim_prompt_cache,
+        make_prompt_cache,
+        trim_prompt_cache,
+    )
+
+    PROMPT_CACHE_AVAILABLE = True
+except ImportError:
+    PROMPT_CACHE_AVAILABLE = False
+
+# Batched generation runs several prompts through the model together; it is
+# only present in newer mlx-lm releases.
+try:
+    from mlx_lm.generate import batch_generate
+
+    BATCH_GENERATE_AVAILABLE = True
+except ImportError:
+    BATCH_GENERATE_AVAILABLE = False
+
+
+def _mlx_memory_function(name: str):
+    """
+    Look up an MLX memory-management function. Newer MLX releases expose
+    these on mlx.core, older ones only on mlx.core.metal.
+    """
+    return getattr(mx, name, None) or getattr(getattr(mx, "metal", None), name, None)
 
 
-class MLXClient:
+class MLXClient(LLMInterface):
     """
     MLX Client for running models natively on Apple Silicon.
     Uses Apple's MLX framework for optimized performance on M-series chips.
@@ -75,12 +150,28 @@ class MLXClient:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
 
-        # Initialize cache for better performance on repeated requests
-        from functools import lru_cache
-        import hashlib
+        # Precompute content truncation limits once instead of on every call
+        self._max_content_length = self.config.MLX_MAX_CONTENT_LENGTH
+        self._truncation_half_length = self._max_content_length // 2
 
+        # Initialize cache for better performance on repeated requests.
+        # Plain dicts keep insertion order, so the first key is always the
+        # least recently used one.
         self._generate_cache = {}
         self._cache_size = 128  # Cache size for generation results
+        # Hits are checked on the event loop thread while the worker thread
+        # stores new answers, so every access goes through this lock
+        self._cache_lock = threading.Lock()
+
+        # Rendered chat template (text before and after the user message)
+        # keyed by system prompt, so the Jinja template renders once per prompt
+        self._chat_template_parts = {}
+
+        # MLX_LOCK serializes generation anyway, so one owned worker thread is
+        # enough and keeps generation off the shared default executor
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mlx-gen"
+        )
 
         # Optimize memory usage for Apple Silicon - only set device if MLX is properly available
         try:
@@ -90,6 +181,8 @@ class MLXClient:
             logging.warning("Could not set MLX GPU device, using default")
             pass
 
+        self._apply_memory_limits()
+
         # Load the model and tokenizer with optimizations
         # Suppress progress bars during model loading to avoid UI conflicts
         import huggingface_hub
@@ -121,8 +214,15 @@ class MLXClient:
             # Ensure model is in eval mode and optimize for inference
             self.model.eval()
 
-            # Pre-warm the model by running a simple generation to initialize GPU
-            self._warmup_model()
+            if self.config.MLX_WIRE_WEIGHTS:
+                self._wire_model_weights()
+
+            # Pre-warm the model in the background so startup isn't blocked on
+            # Metal kernel compilation; generation waits for it to finish
+            self._start_warmup()
+
+            # Create the KV cache reused across generate() calls
+            self._reset_prompt_cache()
 
             logging.info(f"Successfully loaded MLX model: {self.model_name}")
             print("Model loaded. Starting pipeline...")
@@ -134,88 +234,202 @@ class MLXClient:
             logging.error(f"Failed to load MLX model {self.model_name}: {e}")
             raise
 
+    def _apply_memory_limits(self):
+        """Bound MLX's total allocations and its pool of cached Metal buffers."""
+        gigabyte = 1024**3
+        limits = (
+            ("set_memory_limit", self.config.MLX_MAX_RAM_GB),
+            ("set_cache_limit", self.config.MLX_CACHE_LIMIT_GB),
+        )
+        for name, limit_gb in limits:
+            setter = _mlx_memory_function(name)
+            if setter is None:
+                continue
+            try:
+                setter(int(limit_gb * gigabyte))
+            except Exception as e:
+                logging.info(f"MLX {name} skipped: {e}")
+
+    def _wire_model_weights(self):
+        """
+        Ask Metal to keep the model weights wired so they aren't paged out
+        while the GPU sits idle between requests.
+        """
+        set_wired_limit = _mlx_memory_function("set_wired_limit")
+        if set_wired_limit is None:
+            return
+        try:
+            weight_bytes = sum(
+                array.nbytes for _, array in tree_flatten(self.model.parameters())
+            )
+            set_wired_limit(weight_bytes)
+            logging.info(f"Wired {weight_bytes / 1024**3:.1f} GB of MLX model weights")
+        except Exception as e:
+            # Raised e.g. when the weights exceed the recommended working set
+            logging.info(f"MLX weight wiring skipped: {e}")
+
+    def _start_warmup(self):
+        """Start warming up the current model on a background thread."""
+        self._warmup_done = threading.Event()
+        threading.Thread(
+            target=self._warmup_in_background, name="mlx-warmup", daemon=True
+        ).start()
+
+    def _warmup_in_background(self):
+        """Run the model warmup, then let waiting generation calls proceed."""
+        try:
+            # Render both chat templates now so the first request doesn't pay for it
+            self._render_chat_prompt(QUESTION_SYSTEM_PROMPT, "")
+            self._render_chat_prompt(ANSWER_SYSTEM_PROMPT, "")
+        except Exception as e:
+            logging.info(f"Chat template prerender skipped: {e}")
+        try:
+            self._warmup_model()
+        finally:
+            self._warmup_done.set()
+
     def _warmup_model(self):
         """Warm up the model to initialize GPU and cache for better performance."""
         try:
             # Run a simple generation to initialize GPU
-            import time
-
             start_time = time.time()
-            _ = generate(
-                model=self.model,
-                tokenizer=self.tokenizer,
-                prompt="Say hello.",
-                max_tokens=10,
-            )
+            with MLX_LOCK:
+                _ = generate(
+                    model=self.model,
+                    tokenizer=self.tokenizer,
+                    prompt="Say hello.",
+                    max_tokens=10,
+                )
             warmup_time = time.time() - start_time
             logging.info(f"Model warmup completed in {warmup_time:.2f}s")
         except Exception as e:
             # If warmup fails (e.g., due to mocked objects during testing), just log and continue
             logging.info(f"Model warmup skipped: {e}")
 
+    def _wait_for_warmup(self):
+        """Block until the background warmup has finished, if one was started."""
+        warmup_done = getattr(self, "_warmup_done", None)
+        if warmup_done is not None:
+            warmup_done.wait()
+
+    def _reset_prompt_cache(self):
+        """(Re)create the KV cache shared by consecutive generate() calls."""
+        self._prompt_cache = None
+        self._prompt_cache_tokens = []
+        if not PROMPT_CACHE_AVAILABLE:
+            return
+        try:
+            self._prompt_cache = make_prompt_cache(self.model)
+        except Exception as e:
+            logging.info(f"Prompt cache disabled: {e}")
+
+    def _encode_prompt(self, prompt: str) -> List[int]:
+        """Tokenize a rendered prompt the same way mlx-lm does for string prompts."""
+        bos_token = getattr(self.tokenizer, "bos_token", None)
+        return self.tokenizer.encode(
+            prompt,
+            add_special_tokens=bos_token is None or not prompt.startswith(bos_token),
+        )
+
+    def _get_uncached_prompt(self, prompt: str):
+        """
+        Return the part of the prompt that still needs prefilling.
+
+        The prompt is tokenized the same way mlx-lm does it, the KV cache is
+        trimmed back to the longest prefix shared with the previous prompt,
+        and only the remaining tokens are returned. Must hold MLX_LOCK.
+        """
+        tokens = self._encode_prompt(prompt)
+
+        common = 0
+        for cached_token, token in zip(self._prompt_cache_tokens, tokens):
+            if cached_token != token:
+                break
+            common += 1
+        # Always feed at least one token so generation has logits to sample from
+        common = min(common, max(len(tokens) - 1, 0))
+
+        # The cache also holds the previous completion; drop everything past
+        # the shared prefix, or start over if this cache type can't be trimmed
+        cached_length = getattr(self._prompt_cache[0], "offset", None)
+        if cached_length is None or (
+            cached_length > common and not can_trim_prompt_cache(self._prompt_cache)
+        ):
+            self._reset_prompt_cache()
+            common = 0
+        elif cached_length > common:
+            trim_prompt_cache(self._prompt_cache, cached_length - common)
+
+        self._prompt_cache_tokens = tokens
+        return tokens[common:]
+
+    def _truncate_content(self, content: str) -> str:
+        """Keep the beginning and end of oversized content, with a truncation marker."""
+        if len(content) <= self._max_content_length:
+            return content
+        half_length = self._truncation_half_length
+        return (
+            content[:half_length]
+            + "\n... [Content truncated for model context window] ...\n"
+            + content[-half_length:]
+        )
+
+    def _render_chat_prompt(self, system_prompt: str, user_content: str) -> str:
+        """
+        Render a system + user message pair with the tokenizer's chat template.
+
+        The template is rendered once per system prompt with a placeholder
+        user message; later calls splice the real message into the cached
+        text instead of running the Jinja template again.
+        """
+        # Fallback for older tokenizers without apply_chat_template
+        # Construct a simple format that should work with most models
+        if not hasattr(self.tokenizer, "apply_chat_template"):
+            return f"System: {system_prompt}\n\nUser: {user_content}"
+
+        parts = self._chat_template_parts.get(system_prompt)
+        if parts is None:
+            rendered = self.tokenizer.apply_chat_template(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": CHAT_TEMPLATE_PLACEHOLDER},
+                ],
+                tokenize=False,
+                add_generation_prompt=True,
+            )
+            parts = rendered.split(CHAT_TEMPLATE_PLACEHOLDER)
+            if len(parts) != 2:
+                # Template repeats or rewrites the message; render every time
+                parts = False
+            self._chat_template_parts[system_prompt] = parts
+
+        if parts:
+            return parts[0] + user_content + parts[1]
+        return self.tokenizer.apply_chat_template(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            tokenize=False,
+            add_generation_prompt=True,
+        )
+
     def _format_prompt(self, content: str, instruction: str) -> str:
         """
         Format the prompt for the model based on the model type.
         Uses a more code-focused approach for better Q&A generation.
+        Static instructions come before the content so that consecutive prompts
+        share a token prefix that the model's KV cache can reuse.
         """
         # Truncate content if it's too large to avoid context length issues
-        max_content_length = 2048  # Adjust as needed based on model capabilities
-
-        if len(content) > max_content_length:
-            # Keep the beginning and end of content, with an indicator of truncation
-            half_length = max_content_length // 2
-            truncated_content = (
-                content[:half_length]
-                + "\n... [Content truncated for model context window] ...\n"
-                + content[-half_length:]
-            )
-        else:
-            truncated_content = content
-
-        # Format using the model's tokenizer chat template which is required for MLX models
-        messages = [
-            {
-                "role": "system",
-                "content": "You are an expert researcher and analyst. Generate only the specific questions requested by the user. Do not include any template instructions or system messages in your response.",
-            },
-            {
-                "role": "user",
-                "content": f"""Based on the following content, analyze its meaning and generate multiple relevant questions:
-
-CONTENT:
-```
-{truncated_content}
-```
+        truncated_content = self._truncate_content(content)
 
-INSTRUCTION: {instruction}
-
-Generate as many diverse, specific questions as possible to thoroughly test understanding of this content. Focus on the purpose, function, important details, format, structure, relationships, implications, context, and significance. Ask different types of questions: What does it contain? How is it structured? Why is it formatted this way? What are the key elements? What could be improved? What is the context? What are the relationships between parts? How does it relate to other concepts? What assumptions does it make? What are the implications?
-
-IMPORTANT: Return only clear, specific questions. Each question should be on its own line, formatted as "Q1: What does this content do?", "Q2: How is this organized?", etc. Do NOT include ANSWER: sections or empty code blocks like ``` in your response.""",
-            },
-        ]
-
-        # Apply the chat template from the tokenizer if available (required for newer models)
-        if hasattr(self.tokenizer, "apply_chat_template"):
-            prompt = self.tokenizer.apply_chat_template(
-                messages, tokenize=False, add_generation_prompt=True
-            )
-        else:
-            # Fallback for older tokenizers without apply_chat_template
-            # Construct a simple format that should work with most models
-            prompt_parts = []
-            for message in messages:
-                role = message["role"]
-                content = message["content"]
-                if role == "system":
-                    prompt_parts.append(f"System: {content}")
-                elif role == "user":
-                    prompt_parts.append(f"User: {content}")
-                elif role == "assistant":
-                    prompt_parts.append(f"Assistant: {content}")
-            prompt = "\n\n".join(prompt_parts)
-
-        return prompt
+        return self._render_chat_prompt(
+            QUESTION_SYSTEM_PROMPT,
+            QUESTION_USER_TEMPLATE.format(
+                instruction=instruction, content=truncated_content
+            ),
+        )
 
     async def generate_questions(
         self, content: str, temperature: float = 0.7, max_tokens: int = 500, pbar=None
@@ -227,19 +441,30 @@ IMPORTANT: Return only clear, specific questions. Each question should be on its
             pbar.set_description("Generating questions (MLX)")
 
         try:
-            # Create a prompt asking for questions based on the content
-            prompt = self._format_prompt(
-                content,
-                "Generate as many diverse, specific questions as possible about the given content that would help understand its purpose, structure, important elements, relationships, implications, and potential improvements.",
+            # Cache on the template and normalized content rather than the exact prompt
+            cache_key = (
+                "questions",
+                _normalize_content(self._truncate_content(content)),
             )
 
-            # Log the prompt for debugging
-            logging.debug(f"MLX Generate Questions Prompt: {prompt[:100]}...")
+            # A cached result needs neither a prompt nor a trip to the worker thread
+            questions_text = self._cache_get((cache_key, temperature, max_tokens))
+            if questions_text is None:
+                # Create a prompt asking for questions based on the content
+                prompt = self._format_prompt(content, QUESTION_INSTRUCTION)
 
-            # Generate questions
-            questions_text = await asyncio.get_event_loop().run_in_executor(
-                None, self._generate_text_sync, prompt, temperature, max_tokens
-            )
+                # Log the prompt for debugging
+                logging.debug(f"MLX Generate Questions Prompt: {prompt[:100]}...")
+
+                # Generate questions
+                questions_text = await asyncio.get_event_loop().run_in_executor(
+                    self._executor,
+                    self._generate_text_sync,
+                    prompt,
+                    temperature,
+                    max_tokens,
+                    cache_key,
+                )
 
             # Log the response for debugging
             logging.debug(
@@ -265,7 +490,7 @@ Q: What does this code do?
 """
 
                 questions_text = await asyncio.get_event_loop().run_in_executor(
-                    None,
+                    self._executor,
                     self._generate_text_sync,
                     direct_prompt,
                     temperature,
@@ -289,47 +514,88 @@ Q: What does this code do?
 
         except Exception as e:
             logging.error(f"Error generating questions with MLX: {e}")
-            import traceback
-
-            logging.error(f"Full traceback: {traceback.format_exc()}")
+            logging.debug("Full traceback:", exc_info=True)
             return None
 
+    def _cache_get(self, cache_key: tuple) -> Optional[str]:
+        """Look up a cached generation, moving hits to the most recent slot."""
+        with self._cache_lock:
+            cached = self._generate_cache.pop(cache_key, None)
+            if cached is not None:
+                self._generate_cache[cache_key] = cached
+        return cached
+
+    def _cache_put(self, cache_key: tuple, response: str):
+        """Cache a generation, evicting the least recently used entry when full."""
+        with self._cache_lock:
+            if len(self._generate_cache) >= self._cache_size:
+                self._generate_cache.pop(next(iter(self._generate_cache)), None)
+            self._generate_cache[cache_key] = response
+
     def _generate_text_sync(
-        self, prompt: str, temperature: float = 0.7, max_tokens: int = 500
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        cache_key: Optional[tuple] = None,
     ) -> str:
         """
         Generate text synchronously (called from executor for async compatibility).
         With caching and performance optimizations.
-        """
-        # Create cache key from entire prompt and parameters to enable caching
-        # Use full prompt hash to ensure different prompts get different cache entries
-        import hashlib
 
-        cache_hash = hashlib.md5(
-            f"{prompt}_{temperature}_{max_tokens}".encode()
-        ).hexdigest()
+        If cache_key is given (e.g. a template id plus normalized content), it is
+        used instead of the full prompt to identify equivalent requests.
+        """
+        # Key the cache on the prompt and parameters directly; the dict hashes
+        # the tuple itself, so no intermediate string or digest is needed
+        cache_key = (
+            cache_key if cache_key is not None else prompt,
+            temperature,
+            max_tokens,
+        )
 
         # Check cache first for performance
-        if cache_hash in self._generate_cache:
-            return self._generate_cache[cache_hash]
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
 
         # Use lock to prevent concurrent MLX generation which causes GPU command buffer conflicts
         try:
+            self._wait_for_warmup()
             with MLX_LOCK:
+                self._require_model()
                 # Generate with MLX - use only parameters that are actually supported by generate_step
                 # The logs show that generate_step doesn't accept temp, top_p, repetition_penalty
-                response = generate(
-                    model=self.model,
-                    tokenizer=self.tokenizer,
-                    prompt=prompt,
-                    max_tokens=max_tokens,
-                )
+                cache_kwargs = {}
+                if self._prompt_cache is not None:
+                    try:
+                        prompt_input = self._get_uncached_prompt(prompt)
+                    except Exception as e:
+                        logging.info(f"Prompt cache reset after error: {e}")
+                        self._reset_prompt_cache()
+                        prompt_input = prompt
+                    if self._prompt_cache is not None:
+                        cache_kwargs["prompt_cache"] = self._prompt_cache
+                else:
+                    prompt_input = prompt
+
+                try:
+                    response = generate(
+                        model=self.model,
+                        tokenizer=self.tokenizer,
+                        prompt=prompt_input,
+                        max_tokens=max_tokens,
+                        **cache_kwargs,
+                    )
+                except Exception:
+                    # A failed generation leaves the KV cache in an unknown state
+                    if cache_kwargs:
+                        self._reset_prompt_cache()
+                    raise
 
-            # Add to cache (with size limit)
-            if len(self._generate_cache) < self._cache_size:
-                self._generate_cache[cache_hash] = (
-                    response if response is not None else ""
-                )
+                # Stored under the lock so a model swap can't happen between
+                # generating this answer and caching it
+                self._cache_put(cache_key, response if response is not None else "")
 
             return response if response is not None else ""
         except Exception as e:
@@ -338,9 +604,7 @@ Q: What does this code do?
             logging.error(
                 f"Prompt that failed: {prompt[:200]}..."
             )  # Log first 200 chars of prompt
-            import traceback
-
-            logging.error(f"Full traceback: {traceback.format_exc()}")
+            logging.debug("Full traceback:", exc_info=True)
 
             # Inform users about common issues
             error_msg = str(e)
@@ -376,84 +640,45 @@ Q: What does this code do?
         if not text or not text.strip():
             return []
 
-        # Split by common question indicators, clean up, and filter
-        lines = text.split("\n")
+        # One sweep over the whole text: each match is a single question with
+        # any "Q1:"/"Q:"/"Question:"/"1." prefix already excluded from the group
         questions = []
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # Check if line is in the format "Q1: question?", "Q2: question?", etc.
-            if ":" in line and line.startswith(("Q", "q")):
-                # Look for patterns like "Q1: ", "Q2: ", "Q10: ", etc.
-                import re
-
-                q_pattern = r"^[Qq]\d+:\s*(.+?\?)$"
-                match = re.match(q_pattern, line)
-                if match:
-                    question = match.group(1).strip()
-                    if question and len(question) > 3:  # Substantial questions
-                        questions.append(question)
-                elif "?" in line:
-                    # If it has Q# format but no question mark at the end, add it
-                    content = line.split(":", 1)[
-                        1
-                    ].strip()  # Get content after first colon
-                    if "?" not in content and len(content) > 3:
-                        questions.append(f"{content}?")
-
-            # Check for question mark patterns (backup method)
-            elif "?" in line:
-                # Extract all questions that might be in the line
-                parts = line.split("?")
-                for i, part in enumerate(parts[:-1]):  # All but the last part
-                    # Combine with the next part and add the question mark back
-                    question = (part + "?").strip()
-                    # Clean up common prefixes
-                    question = (
-                        question.replace("Q:", "")
-                        .replace("Question:", "")
-                        .replace("1.", "")
-                        .replace("2.", "")
-                        .replace("3.", "")
-                        .replace("4.", "")
-                        .replace("5.", "")
-                        .replace("6.", "")
-                        .replace("7.", "")
-                        .replace("8.", "")
-                        .replace("9.", "")
-                        .replace("10.", "")
-                        .strip()
-                    )
-                    if question and len(question) > 3:  # Only substantial questions
-                        questions.append(question)
-
-            # Alternative: look for numbered questions like "1. What is..." or "2. How does..."
-            import re
-
-            numbered_pattern = r"\d+\.\s*(.+?\?)"
-            matches = re.findall(numbered_pattern, line)
-            for match in matches:
-                cleaned_match = match.strip()
-                if cleaned_match and len(cleaned_match) > 3:
-                    questions.append(cleaned_match)
+        for match in QUESTION_PATTERN.finditer(text):
+            question = match.group(1).strip()
+            if len(question) > 3:  # Only substantial questions
+                questions.append(question)
 
         # Remove duplicates while preserving order
-        seen = set()
-        unique_questions = []
-        for q in questions:
-            if q not in seen and q.strip():
-                seen.add(q)
-                unique_questions.append(q.strip())
+        unique_questions = list(dict.fromkeys(questions))
 
         return (
             unique_questions
             if unique_questions
-            else [f"{text.strip()}?"] if text.strip() and "?" not in text else []
+            else [f"{text.strip()}?"] if "?" not in text else []
         )
 
+    def _clean_answer(self, answer: str, question: str) -> Optional[str]:
+        """Strip echoed labels/question from a generated answer; None if empty."""
+        if answer:
+            answer = answer.replace("Answer:", "").replace(question, "").strip()
+        return answer if answer else None
+
+    def _build_answer_prompt(self, question: str, context: str):
+        """Render the answer prompt and its generation cache key."""
+        # Apply content truncation if needed
+        truncated_context = self._truncate_content(context)
+
+        prompt = self._render_chat_prompt(
+            ANSWER_SYSTEM_PROMPT,
+            ANSWER_USER_TEMPLATE.format(content=truncated_context, question=question),
+        )
+
+        return prompt, self._answer_cache_key(question, context)
+
+    def _answer_cache_key(self, question: str, context: str) -> tuple:
+        """Cache on the template, normalized context and question."""
+        return ("answer", _normalize_content(self._truncate_content(context)), question)
+
     async def get_answer_single(
         self,
         question: str,
@@ -469,91 +694,181 @@ Q: What does this code do?
             pbar.set_description("Generating answer (MLX)")
 
         try:
-            # Apply content truncation if needed
-            max_content_length = 2048
-            if len(context) > max_content_length:
-                half_length = max_content_length // 2
-                truncated_context = (
-                    context[:half_length]
-                    + "\n... [Content truncated for model context window] ...\n"
-                    + context[-half_length:]
-                )
-            else:
-                truncated_context = context
-
-            # Format using the model's tokenizer chat template which is required for MLX models
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are a precise question-answering expert. You will be given content and a specific question about that content. ANSWER ONLY THE QUESTION ASKED using information from the content. Never give generic answers about the content unrelated to the specific question.",
-                },
-                {
-                    "role": "user",
-                    "content": f"""CONTENT FOR REFERENCE:
-```
-{truncated_context}
-```
-
-SPECIFIC QUESTION (ANSWER THIS EXACTLY): {question}
+            # A cached answer needs neither a prompt nor a trip to the worker thread
+            answer = self._cache_get(
+                (self._answer_cache_key(question, context), temperature, max_tokens)
+            )
+            if answer is None:
+                prompt, cache_key = self._build_answer_prompt(question, context)
 
-RESPONSE: Answer ONLY and EXACTLY the question above based on the content shown. Your response must directly address what was asked in the question. If the question asks 'HOW', focus on processes/procedures. If it asks 'WHAT', focus on descriptions. If it asks 'WHY', focus on reasons/purposes. If it asks 'WHERE', focus on locations/URLs. Make sure your answer is specific to what was asked, not a general summary of the content.""",
-                },
-            ]
+                # Log the prompt for debugging
+                logging.debug(f"MLX Get Answer Prompt: {prompt[:100]}...")
 
-            # Apply the chat template from the tokenizer if available (required for newer models)
-            if hasattr(self.tokenizer, "apply_chat_template"):
-                prompt = self.tokenizer.apply_chat_template(
-                    messages, tokenize=False, add_generation_prompt=True
+                # Generate answer
+                answer = await asyncio.get_event_loop().run_in_executor(
+                    self._executor,
+                    self._generate_text_sync,
+                    prompt,
+                    temperature,
+                    max_tokens,
+                    cache_key,
                 )
-            else:
-                # Fallback for older tokenizers without apply_chat_template
-                # Construct a simple format that should work with most models
-                prompt_parts = []
-                for message in messages:
-                    role = message["role"]
-                    content = message["content"]
-                    if role == "system":
-                        prompt_parts.append(f"System: {content}")
-                    elif role == "user":
-                        prompt_parts.append(f"User: {content}")
-                    elif role == "assistant":
-                        prompt_parts.append(f"Assistant: {content}")
-                prompt = "\n\n".join(prompt_parts)
-
-            # Log the prompt for debugging
-            logging.debug(f"MLX Get Answer Prompt: {prompt[:100]}...")
-
-            # Generate answer
-            answer = await asyncio.get_event_loop().run_in_executor(
-                None, self._generate_text_sync, prompt, temperature, max_tokens
-            )
 
             # Log the response for debugging
             logging.debug(
                 f"MLX Get Answer Response: {answer[:200] if answer else 'None'}..."
             )
 
-            # Clean up answer
-            if answer:
-                answer = answer.replace("Answer:", "").replace(question, "").strip()
-
             # Log progress if needed
             if pbar:
                 pbar.set_description("Answer generated (MLX)")
 
-            return answer if answer.strip() else None
+            return self._clean_answer(answer, question)
 
         except Exception as e:
             logging.error(f"Error generating answer with MLX: {e}")
-            import traceback
-
-            logging.error(f"Full traceback: {traceback.format_exc()}")
+            logging.debug("Full traceback:", exc_info=True)
             return None
 
+    async def get_answers_batch(
+        self,
+        batch_of_question_context_tuples: List[tuple],
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        pbar=None,
+    ) -> List[Optional[str]]:
+        """
+        Generate answers for multiple questions, batching them through one
+        model pass per group when the installed mlx-lm supports it.
+        """
+        if BATCH_GENERATE_AVAILABLE:
+            progress_start = pbar.n if pbar is not None else 0
+            try:
+                return await asyncio.get_event_loop().run_in_executor(
+                    self._executor,
+                    self._generate_answers_batch_sync,
+                    batch_of_question_context_tuples,
+                    temperature,
+                    max_tokens,
+                    pbar,
+                )
+            except Exception as e:
+                logging.warning(
+                    f"Batched MLX generation failed, answering one at a time: {e}"
+                )
+                if pbar is not None:
+                    # The answers are about to be counted again
+                    pbar.n = progress_start
+                    pbar.refresh()
+
+        answers = []
+        for question, context in batch_of_question_context_tuples:
+            answers.append(
+                await self.get_answer_single(question, context, temperature, max_tokens)
+            )
+            if pbar is not None:
+                pbar.update(1)
+        return answers
+
+    def _generate_answers_batch_sync(
+        self,
+        batch_of_question_context_tuples: List[tuple],
+        temperature: float,
+        max_tokens: int,
+        pbar=None,
+    ) -> List[Optional[str]]:
+        """
+        Answer a list of (question, context) pairs with mlx-lm batch_generate.
+        Cached answers are reused; the rest are sorted by prompt length and
+        generated in groups of MLX_BATCH_SIZE to keep padding small. pbar is
+        advanced as each group finishes.
+        """
+        results: List[Optional[str]] = [None] * len(batch_of_question_context_tuples)
+        pending = []  # (index, question, cache_key, token ids)
+        for i, (question, context) in enumerate(batch_of_question_context_tuples):
+            prompt, cache_key = self._build_answer_prompt(question, context)
+            cache_key = (cache_key, temperature, max_tokens)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                results[i] = self._clean_answer(cached, question)
+            else:
+                pending.append((i, question, cache_key, self._encode_prompt(prompt)))
+        if pbar is not None and len(pending) < len(results):
+            pbar.update(len(results) - len(pending))
+
+        if pending:
+            self._wait_for_warmup()
+        pending.sort(key=lambda item: len(item[3]))
+        batch_size = self.config.MLX_BATCH_SIZE
+        for start in range(0, len(pending), batch_size):
+            group = pending[start : start + batch_size]
+            with MLX_LOCK:
+                self._require_model()
+                response = batch_generate(
+                    self.model,
+                    self.tokenizer,
+                    prompts=[tokens for _, _, _, tokens in group],
+                    max_tokens=max_tokens,
+                )
+                for (_, _, cache_key, _), text in zip(group, response.texts):
+                    self._cache_put(cache_key, text or "")
+            for (i, question, _, _), text in zip(group, response.texts):
+                results[i] = self._clean_answer(text, question)
+            if pbar is not None:
+                pbar.update(len(group))
+
+        return results
+
+    def _release_model(self):
+        """
+        Drop the model and its KV cache and return their Metal buffers.
+        Must hold MLX_LOCK.
+        """
+        self.model = None
+        self._prompt_cache = None
+        self._prompt_cache_tokens = []
+        clear_cache = _mlx_memory_function("clear_cache")
+        if clear_cache is not None:
+            clear_cache()
+
+    def _require_model(self):
+        """
+        Raise a clear error when there is no model to generate with, e.g.
+        after a failed model swap. Must hold MLX_LOCK.
+        """
+        if self.model is None:
+            raise RuntimeError(
+                "No MLX model is loaded (a model swap failed or the client was "
+                "closed); call update_model() to load one"
+            )
+
+    def _close_sync(self):
+        """Free the model's memory once warmup and queued generation are done."""
+        self._wait_for_warmup()
+        with MLX_LOCK:
+            self._release_model()
+
+    async def aclose(self):
+        """Free the model's memory and shut down the generation worker thread."""
+        # Queued behind any pending generation on the worker thread
+        released = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._close_sync
+        )
+        self._executor.shutdown(wait=False)
+        await released
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
     def clear_context(self):
         """
         Clear any cached context or state.
-        MLX is stateless for generation, so no specific cleanup needed.
+        MLX is stateless for generation, so no specific cleanup needed. The KV
+        prompt cache is kept, since it only ever reuses an exactly matching
+        token prefix.
         """
         pass
 
@@ -561,10 +876,29 @@ RESPONSE: Answer ONLY and EXACTLY the question above based on the content shown.
         """
         Update to a different model.
         """
+        self._wait_for_warmup()
         try:
-            self.model, self.tokenizer = load(model_name, lazy=False)
-            self.model_name = model_name
+            with MLX_LOCK:
+                # Free the old weights first so both models are never resident
+                self._release_model()
+                self.model, self.tokenizer = load(model_name, lazy=False)
+                self.model.eval()
+                if self.config.MLX_WIRE_WEIGHTS:
+                    self._wire_model_weights()
+                # Reset everything tied to the old model before a queued
+                # generation can take the lock and use the new one
+                self.model_name = model_name
+                self._chat_template_parts = {}
+                # Cache keys don't include the model, so old answers must go
+                with self._cache_lock:
+                    self._generate_cache.clear()
+                self._reset_prompt_cache()
+            self._start_warmup()
             logging.info(f"Updated MLX model to: {model_name}")
         except Exception as e:
             logging.error(f"Failed to update MLX model to {model_name}: {e}")
+            if self.model is None:
+                # The old model was already released; don't pair its
+                # tokenizer with whatever gets loaded next
+                self.tokenizer = None
             raise
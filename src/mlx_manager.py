@@ -3,7 +3,7 @@
 import os
 import shutil
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
 
 try:
@@ -16,6 +16,11 @@ except ImportError:
 
 from src.config import AppConfig
 
+# File extensions that mark a cached repo as containing model weights
+WEIGHT_FILE_SUFFIXES = (".safetensors", ".bin")
+
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
 
 class MLXModelManager:
     """Manager for MLX models: list, download, remove, etc."""
@@ -24,9 +29,18 @@ class MLXModelManager:
         self.config = config or AppConfig()
         # Get the cache directory where MLX models are stored
         self.cache_dir = Path.home() / ".cache" / "huggingface" / "hub"
-
-    def list_local_models(self) -> List[Dict[str, str]]:
-        """List locally cached MLX models."""
+        # Directory (size, file count) keyed by path, valid while the
+        # directory signature matches
+        self._stats_cache: Dict[str, tuple] = {}
+
+    def list_local_models(self, include_size: bool = True) -> List[Dict[str, str]]:
+        """
+        List locally cached MLX models.
+
+        Args:
+            include_size: Whether to compute each model's on-disk size, which
+                requires walking the whole model directory
+        """
         if not MLX_AVAILABLE:
             return []
 
@@ -36,36 +50,76 @@ class MLXModelManager:
                 if item.is_dir() and item.name.startswith("models--"):
                     model_name = item.name.replace("models--", "").replace("--", "/")
                     # Check if this looks like an MLX model (has model files)
-                    model_files = list(item.rglob("*.safetensors")) + list(
-                        item.rglob("*.bin")
-                    )
-                    if model_files:
-                        size = self._get_directory_size(item)
-                        models.append(
-                            {
-                                "name": model_name,
-                                "path": str(item),
-                                "size": self._format_size(size),
-                            }
-                        )
+                    if self._has_model_weights(item):
+                        model = {"name": model_name, "path": str(item)}
+                        if include_size:
+                            size, _ = self._get_cached_directory_stats(item)
+                            model["size"] = self._format_size(size)
+                        models.append(model)
         return models
 
-    def _get_directory_size(self, directory: Path) -> int:
-        """Get total size of directory in bytes."""
+    def _has_model_weights(self, directory: Path) -> bool:
+        """Check for any *.safetensors or *.bin file, stopping at the first hit."""
+        pending = [directory]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith(WEIGHT_FILE_SUFFIXES):
+                        return True
+        return False
+
+    def _get_directory_signature(self, directory: Path) -> tuple:
+        """
+        Modification times of a directory and its immediate subdirectories.
+        Downloads into a Hugging Face cache repo add entries under blobs/ and
+        snapshots/, which changes this signature.
+        """
+        with os.scandir(directory) as entries:
+            subdirectories = sorted(
+                (entry.name, entry.stat(follow_symlinks=False).st_mtime_ns)
+                for entry in entries
+                if entry.is_dir(follow_symlinks=False)
+            )
+        return (os.stat(directory).st_mtime_ns, tuple(subdirectories))
+
+    def _get_cached_directory_stats(self, directory: Path) -> Tuple[int, int]:
+        """Get directory stats, reusing the last result while it is unchanged."""
+        key = str(directory)
+        signature = self._get_directory_signature(directory)
+        cached = self._stats_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        stats = self._get_directory_stats(directory)
+        self._stats_cache[key] = (signature, stats)
+        return stats
+
+    def _get_directory_stats(self, directory: Path) -> Tuple[int, int]:
+        """
+        Get total size of directory in bytes and the number of files in it,
+        in a single walk.
+        Symlinks are not followed, so Hugging Face snapshot links to blobs
+        are not counted twice.
+        """
         total_size = 0
-        for dirpath, _, filenames in os.walk(directory):
-            for filename in filenames:
-                filepath = Path(dirpath) / filename
-                total_size += filepath.stat().st_size
-        return total_size
+        file_count = 0
+        pending = [directory]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                        file_count += 1
+        return total_size, file_count
 
     def _format_size(self, size_bytes: int) -> str:
         """Format bytes to human-readable string."""
-        for unit in ["B", "KB", "MB", "GB"]:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
+        # Each unit is 2**10 times the previous one, so the bit length picks it
+        magnitude = min(max(0, (int(size_bytes).bit_length() - 1) // 10), 4)
+        return f"{size_bytes / (1 << (magnitude * 10)):.1f} {SIZE_UNITS[magnitude]}"
 
     def download_model(self, model_name: str) -> bool:
         """Download an MLX model with explicit progress."""
@@ -121,8 +175,13 @@ class MLXModelManager:
             print(f"Error pre-loading model {model_name}: {e}")
             return False
 
-    def remove_model(self, model_name: str) -> bool:
-        """Remove a locally cached MLX model."""
+    def remove_model(self, model_name: str, confirm: bool = False) -> bool:
+        """
+        Remove a locally cached MLX model.
+
+        Nothing is deleted unless confirm is True; prompting the user is left
+        to the caller so this never blocks waiting on stdin.
+        """
         try:
             # Convert model name to directory name format used by HF hub
             dir_name = f"models--{model_name.replace('/', '--')}"
@@ -132,17 +191,12 @@ class MLXModelManager:
                 print(f"Model {model_name} not found in local cache.")
                 return False
 
-            # Confirm before deletion
-            print(f"About to delete model: {model_name}")
-            print(f"Location: {model_path}")
-            print(f"Size: {self._format_size(self._get_directory_size(model_path))}")
-
-            confirm = input("Are you sure you want to delete this model? (yes/no): ")
-            if confirm.lower() not in ["yes", "y"]:
-                print("Deletion cancelled.")
+            if not confirm:
+                print(f"Deletion of {model_name} not confirmed, skipping.")
                 return False
 
             shutil.rmtree(model_path)
+            self._stats_cache.pop(str(model_path), None)
             print(f"Successfully removed model: {model_name}")
             return True
         except Exception as e:
@@ -157,18 +211,13 @@ class MLXModelManager:
             model_path = self.cache_dir / dir_name
 
             if model_path.exists():
-                size = self._get_directory_size(model_path)
-                files = [
-                    str(f.relative_to(model_path))
-                    for f in model_path.rglob("*")
-                    if f.is_file()
-                ]
+                size, file_count = self._get_cached_directory_stats(model_path)
 
                 return {
                     "name": model_name,
                     "path": str(model_path),
                     "size": self._format_size(size),
-                    "file_count": len(files),
+                    "file_count": file_count,
                     "cached": True,
                 }
 
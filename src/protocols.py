@@ -26,6 +26,20 @@ class LLMInterface(ABC):
         """Generate an answer to a question based on context."""
         pass
 
+    @abstractmethod
+    async def get_answers_batch(
+        self,
+        batch_of_question_context_tuples: List[tuple],
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        pbar=None,
+    ) -> List[Optional[str]]:
+        """Generate answers for several (question, context) pairs, in input order.
+
+        pbar, if given, is advanced by one as each answer completes.
+        """
+        pass
+
     @abstractmethod
     def clear_context(self):
         """Clear any cached context or state."""
@@ -11,12 +11,20 @@ from tqdm import tqdm
 from src.config import AppConfig
 from src.db_manager import DBManager
 from src.services.file_processing_service import FileProcessingService
-from src.utils import pause_on_low_battery
+from src.utils import throttled_pause_on_low_battery
 
 # Get the dedicated logger for tqdm output
 tqdm_logger = logging.getLogger("tqdm_logger")
 
 
+def _file_size(file_path: str) -> int:
+    """Return the size of a file, or 0 if it can't be stat'ed."""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
 class BatchProcessingService:
     """Handles concurrent batch processing of files."""
 
@@ -41,15 +49,15 @@ class BatchProcessingService:
     ) -> List[Tuple[str, bool, int]]:
         """Process a batch of files concurrently with specified semaphore."""
         results = []
-        tasks = []
 
         async def process_with_semaphore(file_path: str, pbar_position: int):
+            file_name = os.path.basename(file_path)
             async with semaphore:
-                pause_on_low_battery()
+                throttled_pause_on_low_battery()
                 # Create a temporary pbar for the individual file's Q/A progress
                 pbar = tqdm(
                     total=1,
-                    desc=f"Starting {os.path.basename(file_path)[:64]}...",
+                    desc=f"Starting {file_name[:64]}...",
                     position=pbar_position,
                     leave=False,
                     dynamic_ncols=True,
@@ -69,26 +77,31 @@ class BatchProcessingService:
                 if success:
                     if qa_count > 0:
                         tqdm_logger.debug(
-                            f"    ✓ Processed {os.path.basename(file_path)}: {qa_count} Q&A pairs"
+                            "    ✓ Processed %s: %s Q&A pairs", file_name, qa_count
                         )
                     else:
                         tqdm_logger.debug(
-                            f"    - Skipped {os.path.basename(file_path)} (unchanged or no new Qs)"
+                            "    - Skipped %s (unchanged or no new Qs)", file_name
                         )
                 else:
-                    tqdm_logger.warning(
-                        f"    ✗ Failed to process {os.path.basename(file_path)}"
-                    )
+                    tqdm_logger.warning(f"    ✗ Failed to process {file_name}")
 
                 return (file_path, success, qa_count)
 
         # Create tasks for concurrent processing with proper exception handling
         # MLX operations are now thread-safe using locks, so concurrent processing is safe
-        for i, file_path in enumerate(files):
+        max_workers = self.config.MAX_CONCURRENT_FILES
+        dispatch_order = list(range(len(files)))
+        if max_workers > 1 and len(files) >= 2 * max_workers:
+            # Start the largest files first so a big file picked up last doesn't
+            # leave the other workers idle while it finishes
+            dispatch_order.sort(key=lambda i: _file_size(files[i]), reverse=True)
+
+        tasks = [None] * len(files)
+        for slot, i in enumerate(dispatch_order):
             # The position for the file-specific progress bar, cycling through available slots
-            pbar_pos = (i % self.config.MAX_CONCURRENT_FILES) + 2
-            task = asyncio.create_task(process_with_semaphore(file_path, pbar_pos))
-            tasks.append(task)
+            pbar_pos = (slot % max_workers) + 2
+            tasks[i] = asyncio.create_task(process_with_semaphore(files[i], pbar_pos))
 
         # Wait for all tasks to complete, handling exceptions individually
         for i, task in enumerate(tasks):
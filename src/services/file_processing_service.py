@@ -147,26 +147,24 @@ class FileProcessingService:
                 if hashlib.sha256(q.encode("utf-8")).hexdigest() not in processed_hashes
             ]
             tqdm_logger.debug(
-                f"Found {len(unanswered_questions)} new questions for {file_name}."
+                "Found %s new questions for %s.", len(unanswered_questions), file_name
             )
 
             if pbar is not None:
                 pbar.total = len(unanswered_questions)
                 pbar.refresh()
-
-            for i, question in enumerate(unanswered_questions):
-                if pbar is not None:
-                    pbar.set_description(
-                        f"File: {file_name[:64]:<64} | Ans Q {i+1}/{len(unanswered_questions)}"
-                    )
-                answer = await self.llm_client.get_answer_single(
-                    question,
-                    content,
-                    self.config.DEFAULT_TEMPERATURE,
-                    self.config.DEFAULT_MAX_TOKENS,
-                    pbar,
+                pbar.set_description(
+                    f"File: {file_name[:64]:<64} | Ans {len(unanswered_questions)} Qs"
                 )
+            # All questions share the file content, so answer them as one batch
+            answers = await self.llm_client.get_answers_batch(
+                [(question, content) for question in unanswered_questions],
+                self.config.DEFAULT_TEMPERATURE,
+                self.config.DEFAULT_MAX_TOKENS,
+                pbar,
+            )
 
+            for question, answer in zip(unanswered_questions, answers):
                 if answer is None:
                     tqdm_logger.error(f"LLM failed to generate answer in {file_name}.")
                     file_processed_successfully = False
@@ -175,16 +173,17 @@ class FileProcessingService:
                     )
                     continue
                 current_file_qa_entries.append({"question": question, "answer": answer})
-                if pbar is not None:
-                    pbar.update(1)
 
             if file_processed_successfully and current_file_qa_entries:
                 if pbar is not None:
                     pbar.set_description(f"File: {file_name[:64]:<64} | Saving")
-                for entry in current_file_qa_entries:
-                    self.db_manager.add_qa_sample(
-                        file_path, entry["question"], entry["answer"]
-                    )
+                self.db_manager.add_qa_samples(
+                    file_path,
+                    [
+                        (entry["question"], entry["answer"])
+                        for entry in current_file_qa_entries
+                    ],
+                )
                 self.db_manager.save_file_hash(file_path, current_file_hash)
                 self.db_manager.remove_failed_file(
                     file_path
@@ -141,36 +141,50 @@ class TrainingDataRepository:
         Returns:
             The sample_id of the created sample
         """
-        # Insert into TrainingSamples
-        self.cursor.execute(
-            """
-            INSERT INTO TrainingSamples (dataset_source, model_type_intended, is_multiturn)
-            VALUES (?, ?, ?)
-            """,
-            (f"repo_file:{file_path}", "Instruct", False),
-        )
-        sample_id = self.cursor.lastrowid
+        return self.add_qa_samples(file_path, [(question_text, answer_text)])[0]
 
-        # Insert question as a ConversationTurn (role='user', is_label=FALSE)
-        self.cursor.execute(
-            """
-            INSERT INTO ConversationTurns (sample_id, turn_index, role, content, is_label)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (sample_id, 0, "user", question_text, False),
-        )
+    def add_qa_samples(
+        self, file_path: str, qa_pairs: list[tuple[str, str]]
+    ) -> list[int]:
+        """
+        Add several Q&A samples from one file in a single transaction.
 
-        # Insert answer as a ConversationTurn (role='assistant', is_label=TRUE)
-        self.cursor.execute(
+        Args:
+            file_path: Source file path for the Q&As
+            qa_pairs: (question_text, answer_text) tuples
+
+        Returns:
+            The sample_ids of the created samples, in input order
+        """
+        dataset_source = f"repo_file:{file_path}"
+        sample_ids = []
+        turns = []
+        for question_text, answer_text in qa_pairs:
+            # Insert into TrainingSamples
+            self.cursor.execute(
+                """
+                INSERT INTO TrainingSamples (dataset_source, model_type_intended, is_multiturn)
+                VALUES (?, ?, ?)
+                """,
+                (dataset_source, "Instruct", False),
+            )
+            sample_id = self.cursor.lastrowid
+            sample_ids.append(sample_id)
+            # Question is the user turn, answer the labelled assistant turn
+            turns.append((sample_id, 0, "user", question_text, False))
+            turns.append((sample_id, 1, "assistant", answer_text, True))
+
+        self.cursor.executemany(
             """
             INSERT INTO ConversationTurns (sample_id, turn_index, role, content, is_label)
             VALUES (?, ?, ?, ?, ?)
             """,
-            (sample_id, 1, "assistant", answer_text, True),
+            turns,
         )
+        # One commit (and fsync) for the whole file instead of one per sample
         self.conn.commit()
-        logging.debug(f"Added Q&A sample (ID: {sample_id}) for {file_path}.")
-        return sample_id
+        logging.debug(f"Added {len(sample_ids)} Q&A sample(s) for {file_path}.")
+        return sample_ids
 
     def get_processed_question_hashes(self, file_path: str) -> set[str]:
         """
@@ -90,6 +90,25 @@ def pause_on_low_battery():
             return  # Battery is OK, continue processing
 
 
+# Monotonic time of the last pause_on_low_battery check, for throttling
+_last_battery_check = None
+
+
+def throttled_pause_on_low_battery():
+    """
+    Run pause_on_low_battery at most once every BATTERY_POLL_INTERVAL seconds.
+    Each check spawns pmset, so per-file callers go through this instead.
+    """
+    global _last_battery_check
+    if (
+        _last_battery_check is not None
+        and time.monotonic() - _last_battery_check < config.BATTERY_POLL_INTERVAL
+    ):
+        return
+    pause_on_low_battery()
+    _last_battery_check = time.monotonic()
+
+
 def get_repo_urls_from_file(repos_txt_path="repos.txt"):
     urls = []
     try:
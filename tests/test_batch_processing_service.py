@@ -90,6 +90,36 @@ class TestBatchProcessingService:
         assert file_path2 == "/path/to/file2.py" and success2 is False and qa_count2 == 0
         assert file_path3 == "/path/to/file3.py" and success3 is True and qa_count3 == 3
 
+    @pytest.mark.asyncio
+    async def test_process_files_batch_dispatches_largest_first(self, tmp_path):
+        """Test that larger files start first while results keep input order."""
+        self.config.MAX_CONCURRENT_FILES = 2
+        files = []
+        for name, size in [("a.py", 10), ("b.py", 400), ("c.py", 50), ("d.py", 200)]:
+            path = tmp_path / name
+            path.write_bytes(b"x" * size)
+            files.append(str(path))
+        started = []
+
+        async def mock_process_single_file(file_path, repo_name, pbar=None):
+            started.append(file_path)
+            return (True, 1)
+
+        self.file_processing_service.process_single_file = AsyncMock(
+            side_effect=mock_process_single_file
+        )
+
+        results = await self.service.process_files_batch(
+            files=files,
+            repo_name="test_repo",
+            semaphore=asyncio.Semaphore(2),
+            batch_num=1,
+            total_batches=1
+        )
+
+        assert started == [files[1], files[3], files[2], files[0]]
+        assert [result[0] for result in results] == files
+
     @pytest.mark.asyncio
     async def test_process_files_batch_empty_list(self):
         """Test processing an empty batch."""
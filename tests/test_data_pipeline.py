@@ -79,6 +79,9 @@ class TestDataPipeline:
         # Verify that files that don't exist get cleaned up from the database
         self.db_manager.delete_samples_for_file.assert_called_once_with("/path/to/file2.py")
         self.db_manager.delete_file_hash.assert_called_once_with("/path/to/file2.py")
+        # The LLM is checked up front and its connections released at the end
+        self.llm_client.ensure_ready.assert_awaited_once()
+        self.llm_client.aclose.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_retry_failed_files(self):
@@ -115,6 +118,31 @@ class TestDataPipeline:
         # Verify no processing calls were made
         self.db_manager.remove_failed_file.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_prepare_releases_resources_on_error(self):
+        """Test that the LLM client and database are closed when prepare fails."""
+        self.db_manager.get_all_tracked_files.side_effect = RuntimeError("db error")
+
+        with pytest.raises(RuntimeError):
+            await self.pipeline.prepare()
+
+        self.llm_client.aclose.assert_awaited_once()
+        self.db_manager.close_db.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_retry_failed_files_releases_resources_on_interrupt(self):
+        """Test that an interrupted retry still closes the LLM client and database."""
+        self.db_manager.get_failed_files.return_value = [("/path/to/failed1.py", "error")]
+        mock_file_service = MagicMock()
+        mock_file_service.process_single_file = AsyncMock(side_effect=KeyboardInterrupt)
+        self.pipeline._file_processing_service = mock_file_service
+
+        with patch('src.data_pipeline.tqdm'), pytest.raises(KeyboardInterrupt):
+            await self.pipeline.retry_failed_files()
+
+        self.llm_client.aclose.assert_awaited_once()
+        self.db_manager.close_db.assert_called_once()
+
     def test_export_data(self):
         """Test data export functionality."""
         # Set up the mock db_manager with a db_path attribute
@@ -184,6 +184,34 @@ class TestDBManagerQASamples:
 
             db_manager.close_db()
 
+    def test_add_qa_samples_in_one_call(self):
+        """Test adding all of a file's Q&A samples at once."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "test.db"
+            db_manager = DBManager(db_path)
+
+            sample_ids = db_manager.add_qa_samples(
+                "test.py", [("Question 1?", "Answer 1"), ("Question 2?", "Answer 2")]
+            )
+
+            assert len(sample_ids) == 2
+            assert sample_ids[1] > sample_ids[0]
+
+            conn = sqlite3.connect(db_path)
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT sample_id, turn_index, content FROM ConversationTurns ORDER BY turn_id"
+            )
+            assert cursor.fetchall() == [
+                (sample_ids[0], 0, "Question 1?"),
+                (sample_ids[0], 1, "Answer 1"),
+                (sample_ids[1], 0, "Question 2?"),
+                (sample_ids[1], 1, "Answer 2"),
+            ]
+            conn.close()
+
+            db_manager.close_db()
+
     def test_qa_sample_stored_in_database(self):
         """Test that Q&A sample is correctly stored in database."""
         with tempfile.TemporaryDirectory() as tmpdir:
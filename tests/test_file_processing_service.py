@@ -116,4 +116,38 @@ class TestFileProcessingService:
                     # Verify the failed file was logged
                     self.db_manager.add_failed_file.assert_called_once()
         finally:
-            os.unlink(temp_file_path)
\ No newline at end of file
+            os.unlink(temp_file_path)
+
+    @pytest.mark.asyncio
+    async def test_process_single_file_answers_questions_as_one_batch(self):
+        """Test that all new questions for a file are answered in one batch call."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+            f.write("test content")
+            temp_file_path = f.name
+
+        try:
+            self.service.llm_client.generate_questions = AsyncMock(
+                return_value=["Q1?", "Q2?"]
+            )
+            self.service.llm_client.get_answers_batch = AsyncMock(
+                return_value=["A1", "A2"]
+            )
+            self.db_manager.get_processed_question_hashes.return_value = set()
+
+            with patch.object(self.service, 'calculate_file_hash', return_value="hash123"):
+                self.db_manager.get_file_hash.return_value = None  # File is new
+
+                result = await self.service.process_single_file(temp_file_path, "test_repo")
+
+            assert result == (True, 2)
+            self.service.llm_client.get_answers_batch.assert_awaited_once_with(
+                [("Q1?", "test content"), ("Q2?", "test content")],
+                self.config.DEFAULT_TEMPERATURE,
+                self.config.DEFAULT_MAX_TOKENS,
+                None,
+            )
+            self.db_manager.add_qa_samples.assert_called_once_with(
+                temp_file_path, [("Q1?", "A1"), ("Q2?", "A2")]
+            )
+        finally:
+            os.unlink(temp_file_path)
@@ -2,10 +2,18 @@
 
 import pytest
 import asyncio
+import contextlib
+import itertools
 import json
+import time
 import httpx
 from unittest.mock import AsyncMock, MagicMock, patch, Mock
-from src.llm_client import LLMClient
+from src.llm_client import (
+    LLMClient,
+    extract_delta,
+    iter_sse_data,
+    retry_after_seconds,
+)
 from src.config import AppConfig
 
 
@@ -24,7 +32,7 @@ class MockAsyncClient:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         pass
 
-    async def get(self, url):
+    async def get(self, url, **kwargs):
         self.get_called = True
         if self.side_effect:
             raise self.side_effect
@@ -55,75 +63,120 @@ class MockStreamResponse:
         if self.status_code >= 400:
             raise httpx.HTTPStatusError("Error", request=Mock(), response=Mock())
 
-    async def aiter_lines(self):
+    async def aiter_bytes(self):
         for line in self.mock_data:
-            yield line
+            yield (line + "\n").encode()
+
+
+@pytest.fixture(autouse=True)
+def reset_model_cache():
+    """Keep the class-level model list cache from leaking between tests."""
+    with patch.object(LLMClient, '_model_cache', None), \
+         patch.object(LLMClient, '_model_cache_time', None), \
+         patch.object(LLMClient, '_model_cache_base_url', None):
+        yield
+
+
+def make_ready_client(available_models, **kwargs):
+    """Build an LLMClient whose model discovery has already run."""
+    client = LLMClient(**kwargs)
+    client._select_model(available_models)
+    client._ready.set()
+    return client
 
 
 class TestLLMClientInitialization:
     """Test cases for LLMClient initialization."""
 
-    @patch('src.llm_client.asyncio.run')
-    def test_successful_initialization(self, mock_run):
-        """Test successful LLMClient initialization with available models."""
-        # Mock the model list response
-        mock_run.return_value = ["model1", "model2", "test-model"]
+    def test_successful_initialization(self):
+        """Test that construction only stores settings and does no I/O."""
+        with patch('httpx.AsyncClient') as mock_client_class:
+            client = LLMClient(
+                base_url="http://localhost:8000",
+                model_name="test-model",
+                max_retries=3,
+                retry_delay=5
+            )
+
+        assert client.base_url == "http://localhost:8000"
+        assert client.model_name == "test-model"
+        assert client.max_retries == 3
+        assert client.retry_delay == 5
+        assert not mock_client_class.called
 
+    @pytest.mark.asyncio
+    async def test_ensure_ready_with_available_model(self):
+        """Test that the configured model is kept when the server has it."""
         client = LLMClient(
             base_url="http://localhost:8000",
             model_name="test-model",
             max_retries=3,
             retry_delay=5
         )
+        fetch = AsyncMock(return_value=["model1", "model2", "test-model"])
+
+        with patch.object(client, '_ensure_client', AsyncMock()), \
+             patch.object(client, '_get_available_llm_models', fetch):
+            await client.ensure_ready()
+            await client.ensure_ready()
 
-        assert client.base_url == "http://localhost:8000"
         assert client.model_name == "test-model"
-        assert client.max_retries == 3
-        assert client.retry_delay == 5
+        # Discovery only runs once
+        assert fetch.await_count == 1
 
-    @patch('src.llm_client.asyncio.run')
-    def test_initialization_with_unavailable_model(self, mock_run):
+    @pytest.mark.asyncio
+    async def test_initialization_with_unavailable_model(self):
         """Test initialization when specified model is not available."""
-        # Mock the model list response without the requested model
-        mock_run.return_value = ["model1", "model2"]
-
         client = LLMClient(
             base_url="http://localhost:8000",
             model_name="unavailable-model",
             max_retries=3,
             retry_delay=5
         )
+        fetch = AsyncMock(return_value=["model1", "model2"])
+
+        with patch.object(client, '_ensure_client', AsyncMock()), \
+             patch.object(client, '_get_available_llm_models', fetch):
+            await client.ensure_ready()
 
         # Should fall back to first available model
         assert client.model_name == "model1"
 
-    @patch('src.llm_client.asyncio.run')
-    def test_initialization_with_no_models(self, mock_run):
+    @pytest.mark.asyncio
+    async def test_initialization_with_no_models(self):
         """Test initialization when no models are available."""
-        # Mock empty model list
-        mock_run.return_value = []
+        client = LLMClient(
+            base_url="http://localhost:8000",
+            model_name="test-model",
+            max_retries=3,
+            retry_delay=5
+        )
+        fetch = AsyncMock(return_value=[])
 
-        with pytest.raises(ValueError, match="No usable LLM model available"):
-            LLMClient(
-                base_url="http://localhost:8000",
-                model_name="test-model",
-                max_retries=3,
-                retry_delay=5
-            )
+        with patch.object(client, '_ensure_client', AsyncMock()), \
+             patch.object(client, '_get_available_llm_models', fetch):
+            with pytest.raises(ValueError, match="No usable LLM model available"):
+                await client.ensure_ready()
 
-    @patch('src.llm_client.asyncio.run')
-    def test_initialization_with_connection_error(self, mock_run):
-        """Test initialization when unable to connect to server."""
-        # Mock connection failure
-        mock_run.return_value = []
+    @pytest.mark.asyncio
+    async def test_initialization_with_connection_error(self):
+        """Test that public calls fail when unable to connect to server."""
+        client = LLMClient(
+            base_url="http://localhost:8000",
+            model_name="test-model",
+            max_retries=3,
+            retry_delay=5
+        )
+        mock_client = MockAsyncClient(side_effect=httpx.ConnectError("Connection refused"))
 
-        with pytest.raises(ValueError, match="No usable LLM model available"):
-            LLMClient(
-                base_url="http://localhost:8000",
-                model_name="test-model",
-                max_retries=3,
-                retry_delay=5
-            )
+        with patch.object(client, '_ensure_client', AsyncMock(return_value=mock_client)), \
+             patch.object(LLMClient, '_model_cache', None):
+            with pytest.raises(ValueError, match="No usable LLM model available"):
+                await client.generate_questions(
+                    text="Test code snippet",
+                    temperature=0.7,
+                    max_tokens=100
+                )
 
 
 class TestLLMClientModelList:
@@ -143,13 +196,13 @@ class TestLLMClientModelList:
         }
         mock_client = MockAsyncClient(mock_response=mock_response)
 
-        with patch('src.llm_client.asyncio.run', return_value=["model1", "model2"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1", "model2"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         # Create a real async client for testing
         with patch('httpx.AsyncClient', return_value=mock_client):
@@ -166,13 +219,13 @@ class TestLLMClientModelList:
         mock_response.status_code = 200
         mock_response.json.return_value = {"data": [{"id": "model1"}]}
 
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         # Set cache
         LLMClient._model_cache = ["cached_model1", "cached_model2"]
@@ -187,18 +240,74 @@ class TestLLMClientModelList:
         # Should return cached models, not make new request
         assert models == ["cached_model1", "cached_model2"]
 
+    @pytest.mark.asyncio
+    async def test_get_available_models_cache_is_per_base_url(self):
+        """Test that a model list cached for another server is not reused."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"data": [{"id": "model1"}]}
+
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
+        # Cache populated by a different server
+        LLMClient._model_cache = ["other_server_model"]
+        LLMClient._model_cache_time = time.time()
+        LLMClient._model_cache_base_url = "http://other-host:9000"
+
+        mock_client = MockAsyncClient(mock_response=mock_response)
+
+        with patch('httpx.AsyncClient', return_value=mock_client):
+            async with httpx.AsyncClient() as async_client:
+                models = await client._get_available_llm_models(async_client)
+
+        assert models == ["model1"]
+        assert mock_client.get_called
+        assert LLMClient._model_cache_base_url == "http://localhost:8000"
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_is_remembered_briefly(self):
+        """Test that a failed fetch isn't retried until the negative TTL passes."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+        failing = MockAsyncClient(side_effect=httpx.ConnectError("Connection refused"))
+        assert await client._get_available_llm_models(failing) == []
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"data": [{"id": "model1"}]}
+        recovered = MockAsyncClient(mock_response=mock_response)
+
+        # Within the negative TTL the server is not asked again
+        assert await client._get_available_llm_models(recovered) == []
+        assert not recovered.get_called
+
+        with patch.object(LLMClient, '_model_cache_negative_ttl', 0):
+            assert await client._get_available_llm_models(recovered) == ["model1"]
+        assert recovered.get_called
+
     @pytest.mark.asyncio
     async def test_get_available_models_connection_error(self):
         """Test handling of connection errors when fetching models."""
         mock_client = MockAsyncClient(side_effect=httpx.ConnectError("Connection refused"))
 
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         # Clear cache
         LLMClient._model_cache = None
@@ -215,13 +324,13 @@ class TestLLMClientModelList:
         """Test handling of timeout when fetching models."""
         mock_client = MockAsyncClient(side_effect=httpx.ReadTimeout("Timeout"))
 
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         # Clear cache
         LLMClient._model_cache = None
@@ -243,13 +352,13 @@ class TestLLMClientModelList:
 
         mock_client = MockAsyncClient(mock_response=mock_response)
 
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         # Clear cache
         LLMClient._model_cache = None
@@ -276,13 +385,13 @@ class TestLLMClientAPICall:
 
         mock_stream = MockStreamResponse(mock_data=stream_data)
 
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         with patch('httpx.AsyncClient') as mock_client_class:
             mock_client_instance = MagicMock()
@@ -298,31 +407,31 @@ class TestLLMClientAPICall:
 
         assert result is not None
         assert result["choices"][0]["message"]["content"] == "Hello world"
+        headers = mock_client_instance.stream.call_args[1]["headers"]
+        assert headers["Accept"] == "text/event-stream"
+        assert headers["Cache-Control"] == "no-cache"
 
     @pytest.mark.asyncio
-    async def test_api_call_with_retry_on_connection_error(self):
-        """Test API call retries on connection errors."""
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=1  # Short delay for testing
-            )
+    async def test_api_call_with_whole_message_chunks(self):
+        """Test streaming servers that send complete messages instead of deltas."""
+        stream_data = [
+            'data: {"choices": [{"message": {"content": "Hello world"}, "finish_reason": "stop"}]}',
+            'data: [DONE]'
+        ]
 
-        call_count = 0
+        mock_stream = MockStreamResponse(mock_data=stream_data)
 
-        async def mock_stream_side_effect(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count < 3:
-                raise httpx.ConnectError("Connection failed")
-            # Succeed on third attempt
-            return MockStreamResponse(mock_data=['data: {"choices": [{"delta": {"content": "Success"}}]}'])
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         with patch('httpx.AsyncClient') as mock_client_class:
             mock_client_instance = MagicMock()
-            mock_client_instance.stream = mock_stream_side_effect
+            mock_client_instance.stream.return_value = mock_stream
             mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
             mock_client_instance.__aexit__ = AsyncMock(return_value=None)
             mock_client_class.return_value = mock_client_instance
@@ -332,23 +441,29 @@ class TestLLMClientAPICall:
 
             result = await client._call_llm_api(messages, options, "test_function")
 
-        assert call_count == 3
         assert result is not None
+        assert result["choices"][0]["message"]["content"] == "Hello world"
 
     @pytest.mark.asyncio
-    async def test_api_call_max_retries_exceeded(self):
-        """Test API call returns None after max retries exceeded."""
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=2,
-                retry_delay=0.1
-            )
+    async def test_api_call_without_streaming(self):
+        """Test non-streaming API call returns the full completion."""
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock()
+        mock_response.json.return_value = {
+            "choices": [{"message": {"content": " Hello world "}}]
+        }
+
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         with patch('httpx.AsyncClient') as mock_client_class:
             mock_client_instance = MagicMock()
-            mock_client_instance.stream.side_effect = httpx.ConnectError("Connection failed")
+            mock_client_instance.post = AsyncMock(return_value=mock_response)
             mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
             mock_client_instance.__aexit__ = AsyncMock(return_value=None)
             mock_client_class.return_value = mock_client_instance
@@ -356,91 +471,477 @@ class TestLLMClientAPICall:
             messages = [{"role": "user", "content": "Test"}]
             options = {"temperature": 0.7, "max_tokens": 100}
 
-            result = await client._call_llm_api(messages, options, "test_function")
+            result = await client._call_llm_api(
+                messages, options, "test_function", stream=False
+            )
 
-        assert result is None
+        assert result["choices"][0]["message"]["content"] == "Hello world"
+        assert mock_client_instance.post.call_args[1]["json"]["stream"] is False
+        mock_client_instance.stream.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_api_call_handles_empty_stream(self):
-        """Test API call handles empty streaming response."""
-        stream_data = ['data: [DONE]']
-        mock_stream = MockStreamResponse(mock_data=stream_data)
+    async def test_api_calls_share_one_http_client(self):
+        """Test that consecutive calls reuse the pooled client until it is closed."""
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock()
+        mock_response.json.return_value = {
+            "choices": [{"message": {"content": "Hello"}}]
+        }
 
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         with patch('httpx.AsyncClient') as mock_client_class:
             mock_client_instance = MagicMock()
-            mock_client_instance.stream.return_value = mock_stream
-            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-            mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+            mock_client_instance.post = AsyncMock(return_value=mock_response)
+            mock_client_instance.aclose = AsyncMock()
             mock_client_class.return_value = mock_client_instance
 
             messages = [{"role": "user", "content": "Test"}]
             options = {"temperature": 0.7, "max_tokens": 100}
 
-            result = await client._call_llm_api(messages, options, "test_function")
+            for _ in range(3):
+                await client._call_llm_api(
+                    messages, options, "test_function", stream=False
+                )
+            await client.aclose()
 
-        # Should return None for empty response
-        assert result is None
+        assert mock_client_class.call_count == 1
+        assert mock_client_instance.post.call_count == 3
+        mock_client_instance.aclose.assert_awaited_once()
 
+    @pytest.mark.asyncio
+    async def test_sse_lines_split_across_network_chunks(self):
+        """Test that SSE lines are reassembled from arbitrary byte chunks."""
+        raw = (
+            b'data: {"a": 1}\r\n\n'
+            b": keep-alive comment\n"
+            b'data: {"b": 2}\n\n'
+            b"data: [DONE]"
+        )
+        response = MagicMock()
 
-class TestLLMClientQuestionGeneration:
-    """Test cases for question generation."""
+        async def aiter_bytes():
+            for i in range(0, len(raw), 5):
+                yield raw[i:i + 5]
+
+        response.aiter_bytes = aiter_bytes
+
+        payloads = [chunk async for chunk in iter_sse_data(response)]
+
+        assert payloads == [b'{"a": 1}', b'{"b": 2}', b"[DONE]"]
 
     @pytest.mark.asyncio
-    async def test_generate_questions_success(self):
-        """Test successful question generation."""
+    async def test_api_call_recovers_split_and_concatenated_chunks(self):
+        """Test that objects split across lines or packed into one line are kept."""
         stream_data = [
-            'data: {"choices": [{"delta": {"content": "What is this?"}}]}',
-            'data: {"choices": [{"delta": {"content": "\\nHow does it work?"}}]}',
+            'data: {"choices": [{"delta": {"content": "Hel',
+            'data: lo"}}]}',
+            'data: {"choices": [{"delta": {"content": " wor"}}]}'
+            '{"choices": [{"delta": {"content": "ld"}}]}',
             'data: [DONE]'
         ]
+
         mock_stream = MockStreamResponse(mock_data=stream_data)
 
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         with patch('httpx.AsyncClient') as mock_client_class:
             mock_client_instance = MagicMock()
             mock_client_instance.stream.return_value = mock_stream
-            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-            mock_client_instance.__aexit__ = AsyncMock(return_value=None)
             mock_client_class.return_value = mock_client_instance
 
-            questions = await client.generate_questions(
-                text="Test code snippet",
-                temperature=0.7,
-                max_tokens=100
-            )
+            messages = [{"role": "user", "content": "Test"}]
+            options = {"temperature": 0.7, "max_tokens": 100}
 
-        assert questions is not None
-        assert len(questions) == 2
-        assert "What is this?" in questions
-        assert "How does it work?" in questions
+            result = await client._call_llm_api(messages, options, "test_function")
 
-    @pytest.mark.asyncio
-    async def test_generate_questions_no_response(self):
-        """Test question generation with no LLM response."""
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        assert result["choices"][0]["message"]["content"] == "Hello world"
 
-        with patch.object(client, '_call_llm_api', return_value=None):
+    @pytest.mark.asyncio
+    async def test_api_call_skips_malformed_and_empty_choice_chunks(self):
+        """Test that bad JSON and usage-only chunks do not abort the stream."""
+        stream_data = [
+            ': keep-alive',
+            'data: {"choices": [{"delta": {"content": "Hello"}}]}',
+            'data: {not json',
+            'data: {"choices": [{"delta": {"content": " world"}}]}',
+            'data: {"choices": [], "usage": {"total_tokens": 5}}',
+            'data: [DONE]'
+        ]
+
+        mock_stream = MockStreamResponse(mock_data=stream_data)
+
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
+        with patch('httpx.AsyncClient') as mock_client_class:
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.return_value = mock_stream
+            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+            mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+            mock_client_class.return_value = mock_client_instance
+
+            messages = [{"role": "user", "content": "Test"}]
+            options = {"temperature": 0.7, "max_tokens": 100}
+
+            result = await client._call_llm_api(messages, options, "test_function")
+
+        assert result["choices"][0]["message"]["content"] == "Hello world"
+        assert mock_client_instance.stream.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_api_call_with_retry_on_connection_error(self):
+        """Test API call retries on connection errors."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=1  # Short delay for testing
+        )
+
+        call_count = 0
+
+        async def mock_stream_side_effect(*args, **kwargs):
+            nonlocal call_count
+            call_count += 1
+            if call_count < 3:
+                raise httpx.ConnectError("Connection failed")
+            # Succeed on third attempt
+            return MockStreamResponse(mock_data=['data: {"choices": [{"delta": {"content": "Success"}}]}'])
+
+        with patch('httpx.AsyncClient') as mock_client_class:
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream = mock_stream_side_effect
+            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+            mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+            mock_client_class.return_value = mock_client_instance
+
+            messages = [{"role": "user", "content": "Test"}]
+            options = {"temperature": 0.7, "max_tokens": 100}
+
+            result = await client._call_llm_api(messages, options, "test_function")
+
+        assert call_count == 3
+        assert result is not None
+
+    @pytest.mark.asyncio
+    async def test_api_call_retry_discards_partial_stream(self):
+        """Test that text from a stream that broke off isn't kept on retry."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=2,
+            retry_delay=5
+        )
+
+        class BrokenStreamResponse(MockStreamResponse):
+            async def aiter_bytes(self):
+                yield b'data: {"choices": [{"delta": {"content": "Partial "}}]}\n'
+                raise httpx.ReadError("Connection reset")
+
+        with patch('httpx.AsyncClient') as mock_client_class, \
+             patch('src.llm_client.asyncio.sleep', new_callable=AsyncMock):
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.side_effect = [
+                BrokenStreamResponse(),
+                MockStreamResponse(
+                    mock_data=['data: {"choices": [{"delta": {"content": "Complete"}}]}']
+                ),
+            ]
+            mock_client_class.return_value = mock_client_instance
+
+            messages = [{"role": "user", "content": "Test"}]
+            options = {"temperature": 0.7, "max_tokens": 100}
+
+            result = await client._call_llm_api(messages, options, "test_function")
+
+        assert result["choices"][0]["message"]["content"] == "Complete"
+        assert mock_client_instance.stream.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_api_call_max_retries_exceeded(self):
+        """Test API call returns None after max retries exceeded."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=2,
+            retry_delay=0.1
+        )
+
+        with patch('httpx.AsyncClient') as mock_client_class:
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.side_effect = httpx.ConnectError("Connection failed")
+            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+            mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+            mock_client_class.return_value = mock_client_instance
+
+            messages = [{"role": "user", "content": "Test"}]
+            options = {"temperature": 0.7, "max_tokens": 100}
+
+            result = await client._call_llm_api(messages, options, "test_function")
+
+        assert result is None
+
+    def test_retry_delay_uses_capped_exponential_backoff(self):
+        """Test that retry delays grow exponentially with jitter and are capped."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
+        for attempt, expected in [(0, 5), (1, 10), (2, 20), (5, 30)]:
+            delay = client._get_retry_delay(attempt)
+            assert expected * 0.5 <= delay <= expected
+
+    @pytest.mark.asyncio
+    async def test_api_call_does_not_retry_client_errors(self):
+        """Test that 4xx responses fail immediately instead of retrying."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
+        error = httpx.HTTPStatusError(
+            "Bad Request", request=Mock(), response=Mock(status_code=400)
+        )
+
+        with patch('httpx.AsyncClient') as mock_client_class, \
+             patch('src.llm_client.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.return_value = MockStreamResponse(side_effect=error)
+            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+            mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+            mock_client_class.return_value = mock_client_instance
+
+            messages = [{"role": "user", "content": "Test"}]
+            options = {"temperature": 0.7, "max_tokens": 100}
+
+            result = await client._call_llm_api(messages, options, "test_function")
+
+        assert result is None
+        assert mock_client_instance.stream.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_api_call_retries_rate_limited_requests(self):
+        """Test that a 429 is retried after the wait the server asked for."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=1
+        )
+
+        error = httpx.HTTPStatusError(
+            "Too Many Requests",
+            request=Mock(),
+            response=httpx.Response(429, headers={"Retry-After": "7"}),
+        )
+
+        with patch('httpx.AsyncClient') as mock_client_class, \
+             patch('src.llm_client.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.side_effect = [
+                MockStreamResponse(side_effect=error),
+                MockStreamResponse(
+                    mock_data=['data: {"choices": [{"delta": {"content": "Success"}}]}']
+                ),
+            ]
+            mock_client_class.return_value = mock_client_instance
+
+            messages = [{"role": "user", "content": "Test"}]
+            options = {"temperature": 0.7, "max_tokens": 100}
+
+            result = await client._call_llm_api(messages, options, "test_function")
+
+        assert result["choices"][0]["message"]["content"] == "Success"
+        assert mock_client_instance.stream.call_count == 2
+        mock_sleep.assert_awaited_once_with(7.0)
+
+    def test_retry_after_seconds_parses_header(self):
+        """Test that Retry-After is read as seconds or as an HTTP date."""
+        assert retry_after_seconds(httpx.Response(429)) is None
+        assert retry_after_seconds(
+            httpx.Response(429, headers={"Retry-After": "3"})
+        ) == 3.0
+        assert retry_after_seconds(
+            httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        ) == 0.0
+        assert retry_after_seconds(
+            httpx.Response(429, headers={"Retry-After": "soon"})
+        ) is None
+
+    @pytest.mark.asyncio
+    async def test_api_call_stops_retrying_when_time_budget_is_spent(self):
+        """Test that no further attempts are made once the retry budget runs out."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=5,
+            retry_delay=5
+        )
+
+        with patch('httpx.AsyncClient') as mock_client_class, \
+             patch('src.llm_client.asyncio.sleep', new_callable=AsyncMock) as mock_sleep, \
+             patch('src.llm_client.config.LLM_RETRY_TIME_BUDGET', 0):
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.return_value = MockStreamResponse(
+                side_effect=httpx.ConnectError("Connection refused")
+            )
+            mock_client_class.return_value = mock_client_instance
+
+            messages = [{"role": "user", "content": "Test"}]
+            options = {"temperature": 0.7, "max_tokens": 100}
+
+            result = await client._call_llm_api(messages, options, "test_function")
+
+        assert result is None
+        assert mock_client_instance.stream.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_api_call_retries_slow_timeouts_with_default_budget(self):
+        """Test that an attempt which ran up to the request timeout is retried."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
+        # Every attempt takes longer than the whole retry budget
+        slow_clock = itertools.count(0.0, AppConfig.LLM_REQUEST_TIMEOUT + 1)
+        with patch('httpx.AsyncClient') as mock_client_class, \
+             patch('src.llm_client.asyncio.sleep', new_callable=AsyncMock) as mock_sleep, \
+             patch('src.llm_client.time.monotonic', side_effect=slow_clock):
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.side_effect = [
+                MockStreamResponse(side_effect=httpx.ReadTimeout("Read timed out")),
+                MockStreamResponse(
+                    mock_data=['data: {"choices": [{"delta": {"content": "Success"}}]}']
+                ),
+            ]
+            mock_client_class.return_value = mock_client_instance
+
+            messages = [{"role": "user", "content": "Test"}]
+            options = {"temperature": 0.7, "max_tokens": 100}
+
+            result = await client._call_llm_api(messages, options, "test_function")
+
+        assert result["choices"][0]["message"]["content"] == "Success"
+        assert mock_client_instance.stream.call_count == 2
+        mock_sleep.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_api_call_handles_empty_stream(self):
+        """Test API call handles empty streaming response."""
+        stream_data = ['data: [DONE]']
+        mock_stream = MockStreamResponse(mock_data=stream_data)
+
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
+        with patch('httpx.AsyncClient') as mock_client_class:
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.return_value = mock_stream
+            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+            mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+            mock_client_class.return_value = mock_client_instance
+
+            messages = [{"role": "user", "content": "Test"}]
+            options = {"temperature": 0.7, "max_tokens": 100}
+
+            result = await client._call_llm_api(messages, options, "test_function")
+
+        # Should return None for empty response
+        assert result is None
+
+
+class TestLLMClientQuestionGeneration:
+    """Test cases for question generation."""
+
+    @pytest.mark.asyncio
+    async def test_generate_questions_success(self):
+        """Test successful question generation."""
+        stream_data = [
+            'data: {"choices": [{"delta": {"content": "What is this?"}}]}',
+            'data: {"choices": [{"delta": {"content": "\\nHow does it work?"}}]}',
+            'data: [DONE]'
+        ]
+        mock_stream = MockStreamResponse(mock_data=stream_data)
+
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
+        with patch('httpx.AsyncClient') as mock_client_class:
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.return_value = mock_stream
+            mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+            mock_client_instance.__aexit__ = AsyncMock(return_value=None)
+            mock_client_class.return_value = mock_client_instance
+
+            questions = await client.generate_questions(
+                text="Test code snippet",
+                temperature=0.7,
+                max_tokens=100
+            )
+
+        assert questions is not None
+        assert len(questions) == 2
+        assert "What is this?" in questions
+        assert "How does it work?" in questions
+
+    @pytest.mark.asyncio
+    async def test_generate_questions_no_response(self):
+        """Test question generation with no LLM response."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
+        with patch.object(client, '_call_llm_api', return_value=None):
             questions = await client.generate_questions(
                 text="Test code snippet",
                 temperature=0.7,
@@ -460,13 +961,13 @@ class TestLLMClientQuestionGeneration:
         ]
         mock_stream = MockStreamResponse(mock_data=stream_data)
 
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         with patch('httpx.AsyncClient') as mock_client_class:
             mock_client_instance = MagicMock()
@@ -485,6 +986,29 @@ class TestLLMClientQuestionGeneration:
         assert len(questions) == 2
         assert all(q.endswith("?") for q in questions)
 
+    @pytest.mark.asyncio
+    async def test_generate_questions_strips_whitespace_and_crlf(self):
+        """Test that question lines are stripped like str.strip() would."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+        response = {
+            "choices": [{"message": {"content": "  What is this? \r\nNot a question\r\n\tWhy?\t\n"}}]
+        }
+
+        with patch.object(client, '_call_llm_api', AsyncMock(return_value=response)):
+            questions = await client.generate_questions(
+                text="Test code snippet",
+                temperature=0.7,
+                max_tokens=100
+            )
+
+        assert questions == ["What is this?", "Why?"]
+
 
 class TestLLMClientAnswerGeneration:
     """Test cases for answer generation."""
@@ -499,13 +1023,13 @@ class TestLLMClientAnswerGeneration:
         ]
         mock_stream = MockStreamResponse(mock_data=stream_data)
 
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         with patch('httpx.AsyncClient') as mock_client_class:
             mock_client_instance = MagicMock()
@@ -524,16 +1048,87 @@ class TestLLMClientAnswerGeneration:
         assert answer == "This is the answer."
 
     @pytest.mark.asyncio
-    async def test_get_answer_single_no_response(self):
-        """Test single answer generation with no response."""
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
+    async def test_stream_answer_yields_deltas_in_order(self):
+        """Test that answer text is handed over piece by piece as it streams in."""
+        stream_data = [
+            'data: {"choices": [{"delta": {"content": "This is"}}]}',
+            'data: {"choices": [{"delta": {"content": ""}}]}',
+            'data: {"choices": [{"delta": {"content": " the answer."}}]}',
+            'data: [DONE]'
+        ]
+        mock_stream = MockStreamResponse(mock_data=stream_data)
+
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
+        with patch('httpx.AsyncClient') as mock_client_class:
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.return_value = mock_stream
+            mock_client_class.return_value = mock_client_instance
+
+            parts = [
+                part
+                async for part in client.stream_answer(
+                    question="What is this?",
+                    context="Test context",
+                    temperature=0.7,
+                    max_tokens=100
+                )
+            ]
+
+        assert parts == ["This is", " the answer."]
+        payload = mock_client_instance.stream.call_args.kwargs["json"]
+        assert payload["stream"] is True
+        assert "Question: What is this?" in payload["messages"][1]["content"]
+
+    @pytest.mark.asyncio
+    async def test_stream_answer_frees_slot_when_closed_early(self):
+        """Test that closing a partly read stream gives its request slot back."""
+        stream_data = [
+            'data: {"choices": [{"delta": {"content": "This is"}}]}',
+            'data: {"choices": [{"delta": {"content": " the answer."}}]}',
+        ]
+        with patch('src.llm_client.config.LLM_MAX_CONCURRENCY', 1):
+            client = make_ready_client(
+                ["model1"],
                 base_url="http://localhost:8000",
                 model_name="model1",
                 max_retries=3,
                 retry_delay=5
             )
 
+        with patch('httpx.AsyncClient') as mock_client_class:
+            mock_client_instance = MagicMock()
+            mock_client_instance.stream.return_value = MockStreamResponse(
+                mock_data=stream_data
+            )
+            mock_client_class.return_value = mock_client_instance
+
+            async with contextlib.aclosing(
+                client.stream_answer("What is this?", "Test context", 0.7, 100)
+            ) as parts:
+                async for part in parts:
+                    assert client._request_semaphore.locked()
+                    break
+
+        assert not client._request_semaphore.locked()
+
+    @pytest.mark.asyncio
+    async def test_get_answer_single_no_response(self):
+        """Test single answer generation with no response."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
         with patch.object(client, '_call_llm_api', return_value=None):
             answer = await client.get_answer_single(
                 question="What is this?",
@@ -547,19 +1142,21 @@ class TestLLMClientAnswerGeneration:
     @pytest.mark.asyncio
     async def test_get_answers_batch(self):
         """Test batch answer generation."""
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
-                base_url="http://localhost:8000",
-                model_name="model1",
-                max_retries=3,
-                retry_delay=5
-            )
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
         # Mock get_answer_single to return different answers
-        async def mock_get_answer(question, context, temperature, max_tokens):
+        async def mock_get_answer(question, context, temperature, max_tokens, stream=True):
+            assert stream is False
             return f"Answer to: {question}"
 
-        with patch.object(client, 'get_answer_single', side_effect=mock_get_answer):
+        with patch.object(client, 'get_answer_single', side_effect=mock_get_answer), \
+             patch('src.llm_client.config.LLM_BATCH_CONCURRENCY', 8):
             batch = [
                 ("Question 1?", "Context 1"),
                 ("Question 2?", "Context 2"),
@@ -577,19 +1174,150 @@ class TestLLMClientAnswerGeneration:
         assert answers[1] == "Answer to: Question 2?"
         assert answers[2] == "Answer to: Question 3?"
 
+    @pytest.mark.asyncio
+    async def test_get_answers_batch_keeps_results_when_one_item_fails(self):
+        """Test that one failing item doesn't cost the rest of the batch."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
 
-class TestLLMClientUtilities:
-    """Test utility methods."""
+        async def mock_get_answer(question, context, temperature, max_tokens, stream=True):
+            if question == "Question 2?":
+                raise RuntimeError("boom")
+            await asyncio.sleep(0.01)
+            return f"Answer to: {question}"
 
-    def test_clear_context(self):
-        """Test clear_context method (placeholder)."""
-        with patch('src.llm_client.asyncio.run', return_value=["model1"]):
-            client = LLMClient(
+        with patch.object(client, 'get_answer_single', side_effect=mock_get_answer):
+            answers = await client.get_answers_batch(
+                batch_of_question_context_tuples=[
+                    ("Question 1?", "Context 1"),
+                    ("Question 2?", "Context 2"),
+                    ("Question 3?", "Context 3")
+                ],
+                temperature=0.7,
+                max_tokens=100
+            )
+
+        assert answers == ["Answer to: Question 1?", None, "Answer to: Question 3?"]
+
+    @pytest.mark.asyncio
+    async def test_get_answers_batch_limits_concurrent_requests(self):
+        """Test that no more than LLM_MAX_CONCURRENCY requests run at once."""
+        with patch('src.llm_client.config.LLM_MAX_CONCURRENCY', 2):
+            client = make_ready_client(
+                ["model1"],
                 base_url="http://localhost:8000",
                 model_name="model1",
                 max_retries=3,
                 retry_delay=5
             )
 
+        in_flight = 0
+        peak = 0
+
+        async def mock_call(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"choices": [{"message": {"content": "Answer"}}]}
+
+        with patch.object(client, '_call_llm_api', side_effect=mock_call), \
+             patch('src.llm_client.config.LLM_BATCH_CONCURRENCY', 8):
+            answers = await client.get_answers_batch(
+                batch_of_question_context_tuples=[("Q?", "C")] * 6,
+                temperature=0.7,
+                max_tokens=100
+            )
+
+        assert answers == ["Answer"] * 6
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_get_answers_batch_defaults_to_one_streamed_answer_at_a_time(self):
+        """Test that by default answers are streamed in turn with per-answer progress."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+        pbar = MagicMock()
+        in_flight = 0
+        peak = 0
+        progress_seen = []
+
+        async def mock_get_answer(question, context, temperature, max_tokens, stream=True):
+            nonlocal in_flight, peak
+            assert stream is True
+            progress_seen.append(pbar.update.call_count)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            return f"Answer to: {question}"
+
+        with patch.object(client, 'get_answer_single', side_effect=mock_get_answer):
+            answers = await client.get_answers_batch(
+                [("Q1?", "C"), ("Q2?", "C"), ("Q3?", "C")], 0.7, 100, pbar
+            )
+
+        assert answers == ["Answer to: Q1?", "Answer to: Q2?", "Answer to: Q3?"]
+        assert peak == 1
+        # Each answer starts only after the previous one was counted
+        assert progress_seen == [0, 1, 2]
+        assert pbar.update.call_count == 3
+
+
+    def test_get_answers_batch_across_event_loops(self):
+        """Test that a client reused under a second asyncio.run() still works."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
+        async def mock_call(*args, **kwargs):
+            await asyncio.sleep(0.001)
+            return {"choices": [{"message": {"content": "Answer"}}]}
+
+        batch = [("Q?", "C")] * 20
+        with patch.object(client, '_call_llm_api', side_effect=mock_call), \
+             patch('src.llm_client.config.LLM_BATCH_CONCURRENCY', 8):
+            first = asyncio.run(client.get_answers_batch(batch, 0.7, 100))
+            second = asyncio.run(client.get_answers_batch(batch, 0.7, 100))
+
+        assert first == ["Answer"] * 20
+        assert second == ["Answer"] * 20
+
+class TestLLMClientUtilities:
+    """Test utility methods."""
+
+    def test_extract_delta_chunk_shapes(self):
+        """Test that delta text is found for each streamed chunk shape."""
+        assert extract_delta({"choices": [{"delta": {"content": "hi"}}]}) == "hi"
+        assert extract_delta({"choices": [{"delta": {"role": "assistant"}}]}) is None
+        assert extract_delta({"choices": [{"message": {"content": "all"}}]}) == "all"
+        assert extract_delta({"choices": [], "usage": {}}) is None
+        assert extract_delta([1, 2]) is None
+
+    def test_clear_context(self):
+        """Test clear_context method (placeholder)."""
+        client = make_ready_client(
+            ["model1"],
+            base_url="http://localhost:8000",
+            model_name="model1",
+            max_retries=3,
+            retry_delay=5
+        )
+
         # Should not raise any errors
         client.clear_context()
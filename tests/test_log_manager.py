@@ -0,0 +1,51 @@
+"""Unit tests for the LogManager class."""
+
+import os
+
+from src.config import AppConfig
+from src.log_manager import LogManager
+
+
+class TestLogManagerCleanup:
+    """Test cases for removing old log files."""
+
+    def _make_log(self, logs_dir, name, mtime):
+        """Create a log file with a fixed modification time."""
+        path = logs_dir / name
+        path.write_text("log")
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_cleanup_keeps_newest_logs(self, tmp_path):
+        """Test that the oldest logs are removed to make room for a new one."""
+        manager = LogManager(tmp_path, AppConfig())
+        logs = [
+            self._make_log(tmp_path, f"pipeline_log_{i}.log", 1_000_000 + i)
+            for i in range(5)
+        ]
+
+        manager.cleanup_old_logs(3)
+
+        remaining = sorted(p.name for p in tmp_path.iterdir())
+        assert remaining == [logs[3].name, logs[4].name]
+
+    def test_cleanup_ignores_other_files(self, tmp_path):
+        """Test that files without the log prefix or suffix are never removed."""
+        manager = LogManager(tmp_path, AppConfig())
+        self._make_log(tmp_path, "other.log", 1)
+        self._make_log(tmp_path, "pipeline_log_notes.txt", 1)
+        self._make_log(tmp_path, "pipeline_log_1.log", 1_000_000)
+
+        manager.cleanup_old_logs(1)
+
+        remaining = sorted(p.name for p in tmp_path.iterdir())
+        assert remaining == ["other.log", "pipeline_log_notes.txt"]
+
+    def test_cleanup_under_limit_keeps_everything(self, tmp_path):
+        """Test that nothing is removed while below the retention limit."""
+        manager = LogManager(tmp_path, AppConfig())
+        self._make_log(tmp_path, "pipeline_log_1.log", 1_000_000)
+
+        manager.cleanup_old_logs(5)
+
+        assert [p.name for p in tmp_path.iterdir()] == ["pipeline_log_1.log"]
@@ -0,0 +1,60 @@
+"""Unit tests for logging configuration helpers."""
+
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+
+from src.logging_config import (
+    configure_scrape_logging,
+    configure_tqdm_logging,
+    stop_queued_logging,
+)
+
+
+@pytest.fixture
+def restore_root_logger():
+    """Restore the root logger's handlers and level after a test."""
+    root_logger = logging.getLogger()
+    handlers = root_logger.handlers[:]
+    level = root_logger.level
+    yield root_logger
+    stop_queued_logging()
+    root_logger.handlers[:] = handlers
+    root_logger.setLevel(level)
+
+
+class TestQueuedFileLogging:
+    """Test cases for writing log files from a background thread."""
+
+    @pytest.mark.parametrize("configure", [configure_scrape_logging, configure_tqdm_logging])
+    def test_file_records_go_through_queue(self, tmp_path, restore_root_logger, configure):
+        """Test that file logging is queued and flushed when stopped."""
+        log_file = tmp_path / "pipeline_log_test.log"
+
+        configure(log_file)
+        logging.info("queued message")
+        logging.debug("filtered message")
+        stop_queued_logging()
+
+        assert any(isinstance(h, QueueHandler) for h in restore_root_logger.handlers)
+        contents = log_file.read_text()
+        assert "queued message" in contents
+        assert "filtered message" not in contents
+
+    def test_reconfiguring_replaces_listener(self, tmp_path, restore_root_logger):
+        """Test that configuring twice writes only to the newest log file."""
+        first = tmp_path / "first.log"
+        second = tmp_path / "second.log"
+
+        configure_tqdm_logging(first)
+        configure_tqdm_logging(second)
+        logging.info("after reconfigure")
+        stop_queued_logging()
+
+        assert "after reconfigure" not in first.read_text()
+        assert "after reconfigure" in second.read_text()
+        queue_handlers = [
+            h for h in restore_root_logger.handlers if isinstance(h, QueueHandler)
+        ]
+        assert len(queue_handlers) == 1
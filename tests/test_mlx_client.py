@@ -1,10 +1,13 @@
 """Unit tests for the MLXClient."""
 
+import concurrent.futures
+import threading
 from unittest.mock import MagicMock, patch, AsyncMock
 import pytest
 
-from src.mlx_client import MLXClient
+from src.mlx_client import MLX_LOCK, MLXClient, _normalize_content
 from src.config import AppConfig
+from src.protocols import LLMInterface
 
 
 class TestMLXClient:
@@ -47,6 +50,11 @@ class TestMLXClient:
             assert client.config == config
             mock_load.assert_called_once()
 
+    def test_mlx_client_implements_llm_interface(self):
+        """Test that MLXClient provides every method of the LLM interface."""
+        assert issubclass(MLXClient, LLMInterface)
+        assert not MLXClient.__abstractmethods__
+
     @pytest.mark.asyncio
     async def test_generate_questions(self):
         """Test question generation."""
@@ -112,4 +120,462 @@ class TestMLXClient:
 
             # This should not raise any exceptions
             client.clear_context()
-            # MLX is stateless for generation, so no specific action needed
\ No newline at end of file
+            # MLX is stateless for generation, so no specific action needed
+
+
+class TestMLXQuestionParsing:
+    """Test cases for MLXClient._parse_questions (no MLX runtime needed)."""
+
+    def setup_method(self):
+        """Create a client without running __init__ so no model is loaded."""
+        self.client = MLXClient.__new__(MLXClient)
+
+    def test_parse_q_numbered_format(self):
+        """Test parsing of "Q1: ...?" formatted questions."""
+        text = "Q1: What does this function do?\nQ2: How is it organized?"
+        assert self.client._parse_questions(text) == [
+            "What does this function do?",
+            "How is it organized?",
+        ]
+
+    def test_parse_numbered_list_format(self):
+        """Test parsing of "1. ...?" formatted questions."""
+        text = "1. What is X?\n2. Why is Y used?"
+        assert self.client._parse_questions(text) == ["What is X?", "Why is Y used?"]
+
+    def test_parse_q_format_without_question_mark(self):
+        """Test that a Q# line without a question mark is kept verbatim with one added."""
+        assert self.client._parse_questions("Q3: Describe the layout") == [
+            "Q3: Describe the layout?"
+        ]
+
+    def test_parse_removes_duplicates(self):
+        """Test that repeated questions are only returned once."""
+        text = "What is this? What is this?\nWhat is this?"
+        assert self.client._parse_questions(text) == ["What is this?"]
+
+    def test_parse_multiple_questions_per_line(self):
+        """Test that each question on a line is returned without its prefix."""
+        text = "Question: What is the purpose? And why? Q: How so?"
+        assert self.client._parse_questions(text) == [
+            "What is the purpose?",
+            "And why?",
+            "How so?",
+        ]
+
+    def test_parse_numbered_questions_on_one_line(self):
+        """Test that inline numbering is stripped from each question."""
+        text = "10. How about ten? 11. And eleven?"
+        assert self.client._parse_questions(text) == ["How about ten?", "And eleven?"]
+
+    def test_parse_empty_text(self):
+        """Test that empty or whitespace-only text yields no questions."""
+        assert self.client._parse_questions("") == []
+        assert self.client._parse_questions("   \n  ") == []
+
+    def test_parse_statement_fallback(self):
+        """Test that text without any question mark is turned into one question."""
+        assert self.client._parse_questions("Just a statement") == [
+            "Just a statement?"
+        ]
+
+
+class TestMLXContentNormalization:
+    """Test cases for the generation cache key normalization."""
+
+    def test_normalize_ignores_line_endings_and_trailing_whitespace(self):
+        """Test that CRLF and trailing spaces don't produce distinct keys."""
+        assert _normalize_content("a = 1  \r\nb = 2\r\n\n") == _normalize_content(
+            "a = 1\nb = 2"
+        )
+
+    def test_normalize_preserves_indentation(self):
+        """Test that leading indentation still distinguishes content."""
+        assert _normalize_content("if x:\n    y()") != _normalize_content(
+            "if x:\ny()"
+        )
+
+
+class TestMLXPromptCache:
+    """Test cases for KV prompt cache prefix reuse (no MLX runtime needed)."""
+
+    def setup_method(self):
+        """Create a client with a character-level fake tokenizer and cache."""
+        self.client = MLXClient.__new__(MLXClient)
+        self.client.tokenizer = MagicMock(bos_token=None)
+        self.client.tokenizer.encode.side_effect = (
+            lambda text, add_special_tokens=True: [ord(c) for c in text]
+        )
+        self.layer_cache = MagicMock(offset=0)
+        self.client._prompt_cache = [self.layer_cache]
+        self.client._prompt_cache_tokens = []
+
+    def test_only_unshared_suffix_is_prefilled(self):
+        """Test that the cache is trimmed to the shared prefix."""
+        with patch('src.mlx_client.can_trim_prompt_cache', return_value=True, create=True), \
+             patch('src.mlx_client.trim_prompt_cache', create=True) as mock_trim:
+            assert self.client._get_uncached_prompt("abc") == [ord(c) for c in "abc"]
+            mock_trim.assert_not_called()
+
+            # Cache now holds the 3 prompt tokens plus 2 generated tokens
+            self.layer_cache.offset = 5
+            assert self.client._get_uncached_prompt("abd") == [ord("d")]
+            mock_trim.assert_called_once_with(self.client._prompt_cache, 3)
+
+    def test_identical_prompt_still_feeds_one_token(self):
+        """Test that a fully cached prompt leaves one token for generation."""
+        self.client._prompt_cache_tokens = [ord(c) for c in "abc"]
+        self.layer_cache.offset = 3
+        with patch('src.mlx_client.can_trim_prompt_cache', return_value=True, create=True), \
+             patch('src.mlx_client.trim_prompt_cache', create=True) as mock_trim:
+            assert self.client._get_uncached_prompt("abc") == [ord("c")]
+            mock_trim.assert_called_once_with(self.client._prompt_cache, 1)
+
+    def test_untrimmable_cache_is_recreated(self):
+        """Test that a cache that can't be trimmed is rebuilt from scratch."""
+        self.client._prompt_cache_tokens = [ord(c) for c in "abc"]
+        self.layer_cache.offset = 3
+        with patch('src.mlx_client.can_trim_prompt_cache', return_value=False, create=True), \
+             patch.object(self.client, '_reset_prompt_cache') as mock_reset:
+            assert self.client._get_uncached_prompt("abd") == [ord(c) for c in "abd"]
+            mock_reset.assert_called_once()
+
+
+class TestMLXMemoryLimits:
+    """Test cases for MLX memory limits (no MLX runtime needed)."""
+
+    def setup_method(self):
+        """Create a client with default configuration."""
+        self.client = MLXClient.__new__(MLXClient)
+        self.client.config = AppConfig()
+
+    def test_limits_applied_from_config(self):
+        """Test that memory and cache limits are set in bytes from the config."""
+        mock_mx = MagicMock()
+        with patch('src.mlx_client.mx', mock_mx, create=True):
+            self.client._apply_memory_limits()
+
+        mock_mx.set_memory_limit.assert_called_once_with(32 * 1024**3)
+        mock_mx.set_cache_limit.assert_called_once_with(4 * 1024**3)
+
+    def test_limits_fall_back_to_metal_namespace(self):
+        """Test that older MLX releases are configured through mx.metal."""
+        mock_mx = MagicMock(spec=["metal"])
+        with patch('src.mlx_client.mx', mock_mx, create=True):
+            self.client._apply_memory_limits()
+
+        mock_mx.metal.set_cache_limit.assert_called_once_with(4 * 1024**3)
+
+    def test_model_weights_wired(self):
+        """Test that the wired limit covers the model's parameter bytes."""
+        mock_mx = MagicMock()
+        self.client.model = MagicMock()
+        params = [("a", MagicMock(nbytes=100)), ("b", MagicMock(nbytes=50))]
+        with patch('src.mlx_client.mx', mock_mx, create=True), \
+             patch('src.mlx_client.tree_flatten', return_value=params, create=True):
+            self.client._wire_model_weights()
+
+        mock_mx.set_wired_limit.assert_called_once_with(150)
+
+
+class TestMLXModelLifecycle:
+    """Test cases for swapping and releasing models (no MLX runtime needed)."""
+
+    def setup_method(self):
+        """Create a client holding a fake model and a warm generation cache."""
+        self.client = MLXClient.__new__(MLXClient)
+        self.client.config = AppConfig()
+        self.client.config.MLX_WIRE_WEIGHTS = False
+        self.client.model = MagicMock()
+        self.client.tokenizer = MagicMock()
+        self.client._prompt_cache = None
+        self.client._prompt_cache_tokens = []
+        self.client._chat_template_parts = {}
+        self.client._generate_cache = {("p", 0.7, 50): "old answer"}
+        self.client._cache_lock = threading.Lock()
+        self.client._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mlx-gen"
+        )
+
+    def test_update_model_frees_old_model_before_loading(self):
+        """Test that the old model is dropped and cached answers are cleared."""
+        mock_mx = MagicMock()
+        new_model = MagicMock()
+        models_seen_by_load = []
+
+        def fake_load(model_name, lazy):
+            models_seen_by_load.append(self.client.model)
+            return new_model, MagicMock()
+
+        with patch('src.mlx_client.mx', mock_mx, create=True), \
+             patch('src.mlx_client.load', side_effect=fake_load, create=True), \
+             patch.object(self.client, '_start_warmup'), \
+             patch.object(self.client, '_reset_prompt_cache'):
+            self.client.update_model("other-model")
+
+        assert models_seen_by_load == [None]
+        mock_mx.clear_cache.assert_called_once()
+        assert self.client.model is new_model
+        assert self.client.model_name == "other-model"
+        assert self.client._generate_cache == {}
+
+    def test_update_model_resets_state_under_lock(self):
+        """Test that old-model state is reset before the lock is released."""
+        seen_at_reset = []
+
+        def fake_reset():
+            seen_at_reset.append(
+                (MLX_LOCK.locked(), self.client.model_name, self.client._generate_cache)
+            )
+
+        with patch('src.mlx_client.mx', MagicMock(), create=True), \
+             patch('src.mlx_client.load', return_value=(MagicMock(), MagicMock()),
+                   create=True), \
+             patch.object(self.client, '_start_warmup'), \
+             patch.object(self.client, '_reset_prompt_cache', side_effect=fake_reset):
+            self.client.update_model("other-model")
+
+        assert seen_at_reset == [(True, "other-model", {})]
+
+    def test_failed_swap_reports_missing_model(self, caplog):
+        """Test that generating after a failed model load gives a clear error."""
+        with patch('src.mlx_client.mx', MagicMock(), create=True), \
+             patch('src.mlx_client.load', side_effect=OSError("not found"), create=True):
+            with pytest.raises(OSError):
+                self.client.update_model("missing-model")
+
+        assert self.client.model is None
+        assert self.client.tokenizer is None
+        with patch('src.mlx_client.generate', create=True) as mock_generate:
+            assert self.client._generate_text_sync("prompt", 0.7, 50) == ""
+
+        mock_generate.assert_not_called()
+        assert "No MLX model is loaded" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_aclose_releases_model(self):
+        """Test that closing the client drops the model and stops the worker."""
+        mock_mx = MagicMock()
+        with patch('src.mlx_client.mx', mock_mx, create=True):
+            await self.client.aclose()
+
+        assert self.client.model is None
+        mock_mx.clear_cache.assert_called_once()
+        with pytest.raises(RuntimeError):
+            self.client._executor.submit(print)
+
+    @pytest.mark.asyncio
+    async def test_async_context_manager_closes_client(self):
+        """Test that leaving an async with block releases the model."""
+        with patch('src.mlx_client.mx', MagicMock(), create=True):
+            async with self.client as client:
+                assert client is self.client
+
+        assert self.client.model is None
+
+
+class TestMLXChatTemplate:
+    """Test cases for chat template rendering (no MLX runtime needed)."""
+
+    def setup_method(self):
+        """Create a client with a fake chat-template tokenizer."""
+        self.client = MLXClient.__new__(MLXClient)
+        self.client._chat_template_parts = {}
+        self.client.tokenizer = MagicMock()
+        self.client.tokenizer.apply_chat_template.side_effect = (
+            lambda messages, tokenize, add_generation_prompt: "".join(
+                f"<|{m['role']}|>{m['content']}<|end|>" for m in messages
+            )
+            + "<|assistant|>"
+        )
+
+    def test_template_rendered_once_per_system_prompt(self):
+        """Test that repeated prompts reuse the rendered template text."""
+        first = self.client._render_chat_prompt("sys", "user one")
+        second = self.client._render_chat_prompt("sys", "user two")
+
+        assert first == "<|system|>sys<|end|><|user|>user one<|end|><|assistant|>"
+        assert second == "<|system|>sys<|end|><|user|>user two<|end|><|assistant|>"
+        assert self.client.tokenizer.apply_chat_template.call_count == 1
+
+    def test_template_without_single_placeholder_renders_every_time(self):
+        """Test that templates which repeat the message are not spliced."""
+        self.client.tokenizer.apply_chat_template.side_effect = (
+            lambda messages, tokenize, add_generation_prompt: messages[1]["content"] * 2
+        )
+
+        assert self.client._render_chat_prompt("sys", "ab") == "abab"
+        assert self.client._render_chat_prompt("sys", "cd") == "cdcd"
+
+
+class TestMLXGenerationCache:
+    """Test cases for the LRU generation cache (no MLX runtime needed)."""
+
+    def setup_method(self):
+        """Create a client with a tiny cache and no prompt cache."""
+        self.client = MLXClient.__new__(MLXClient)
+        self.client.model = MagicMock()
+        self.client.tokenizer = MagicMock()
+        self.client._prompt_cache = None
+        self.client._generate_cache = {}
+        self.client._cache_lock = threading.Lock()
+        self.client._cache_size = 2
+
+    def test_cache_hit_skips_generation(self):
+        """Test that a repeated request is served from the cache."""
+        with patch('src.mlx_client.generate', return_value="answer", create=True) as mock_generate:
+            assert self.client._generate_text_sync("p", 0.7, 50) == "answer"
+            assert self.client._generate_text_sync("p", 0.7, 50) == "answer"
+        assert mock_generate.call_count == 1
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the oldest unused entry is dropped when the cache is full."""
+        with patch('src.mlx_client.generate', side_effect=lambda **kw: kw["prompt"], create=True):
+            self.client._generate_text_sync("a", 0.7, 50)
+            self.client._generate_text_sync("b", 0.7, 50)
+            self.client._generate_text_sync("a", 0.7, 50)  # refresh "a"
+            self.client._generate_text_sync("c", 0.7, 50)
+
+        assert ("a", 0.7, 50) in self.client._generate_cache
+        assert ("b", 0.7, 50) not in self.client._generate_cache
+        assert ("c", 0.7, 50) in self.client._generate_cache
+
+    def test_cache_writes_wait_for_cache_lock(self):
+        """Test that a worker-thread write can't interleave with a lookup."""
+        with self.client._cache_lock:
+            writer = threading.Thread(
+                target=self.client._cache_put, args=(("a", 0.7, 50), "answer")
+            )
+            writer.start()
+            writer.join(timeout=0.05)
+            assert writer.is_alive()
+            assert self.client._generate_cache == {}
+        writer.join()
+
+        assert self.client._cache_get(("a", 0.7, 50)) == "answer"
+
+    def test_generation_waits_for_background_warmup(self):
+        """Test that a request arriving during warmup only runs once it finishes."""
+        self.client._warmup_done = threading.Event()
+        with patch('src.mlx_client.generate', return_value="answer", create=True) as mock_generate:
+            worker = threading.Thread(
+                target=self.client._generate_text_sync, args=("p", 0.7, 50)
+            )
+            worker.start()
+            worker.join(timeout=0.05)
+            assert not mock_generate.called
+
+            self.client._warmup_done.set()
+            worker.join(timeout=5)
+
+        assert mock_generate.call_count == 1
+
+
+class TestMLXBatchAnswers:
+    """Test cases for batched answer generation (no MLX runtime needed)."""
+
+    def setup_method(self):
+        """Create a client with a fake tokenizer and a batch size of 2."""
+        self.client = MLXClient.__new__(MLXClient)
+        self.client.config = AppConfig()
+        self.client.config.MLX_BATCH_SIZE = 2
+        self.client.model = MagicMock()
+        self.client.tokenizer = MagicMock(spec=["encode", "bos_token"], bos_token=None)
+        self.client.tokenizer.encode.side_effect = (
+            lambda text, add_special_tokens=True: list(range(len(text)))
+        )
+        self.client._max_content_length = 2048
+        self.client._truncation_half_length = 1024
+        self.client._generate_cache = {}
+        self.client._cache_lock = threading.Lock()
+        self.client._cache_size = 128
+        self.client._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mlx-gen"
+        )
+
+    def teardown_method(self):
+        """Stop the client's generation worker thread."""
+        self.client._executor.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_answer_generated_on_dedicated_thread(self):
+        """Test that generation runs on the client's own worker thread."""
+        thread_names = []
+
+        def fake_generate(*args):
+            thread_names.append(threading.current_thread().name)
+            return "answer"
+
+        with patch.object(self.client, '_generate_text_sync', side_effect=fake_generate):
+            assert await self.client.get_answer_single("Q?", "ctx") == "answer"
+
+        assert thread_names[0].startswith("mlx-gen")
+
+    @pytest.mark.asyncio
+    async def test_cached_answer_skips_prompt_and_worker(self):
+        """Test that a cached answer is returned without building a prompt."""
+        cache_key = self.client._answer_cache_key("Q?", "ctx")
+        self.client._cache_put((cache_key, 0.7, 100), "cached answer")
+
+        with patch.object(self.client, '_build_answer_prompt') as mock_build, \
+             patch.object(self.client, '_generate_text_sync') as mock_sync:
+            answer = await self.client.get_answer_single("Q?", "ctx", 0.7, 100)
+
+        assert answer == "cached answer"
+        mock_build.assert_not_called()
+        mock_sync.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_answers_keep_input_order(self):
+        """Test that answers come back in input order across batch groups."""
+        batch = [
+            ("Q one?", "a much longer context than the others"),
+            ("Q two?", "ctx"),
+            ("Q three?", "medium context"),
+        ]
+
+        def fake_batch_generate(model, tokenizer, prompts, max_tokens):
+            # Longer prompts get longer answers so ordering is observable
+            return MagicMock(texts=[f"answer-{len(p)}" for p in prompts])
+
+        with patch('src.mlx_client.BATCH_GENERATE_AVAILABLE', True), \
+             patch('src.mlx_client.batch_generate', side_effect=fake_batch_generate, create=True) as mock_batch:
+            answers = await self.client.get_answers_batch(batch, 0.7, 100)
+
+        prompt_lengths = [
+            len(self.client._build_answer_prompt(q, c)[0]) for q, c in batch
+        ]
+        assert answers == [f"answer-{n}" for n in prompt_lengths]
+        # Three pending prompts with a batch size of 2 need two calls
+        assert mock_batch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_answers_advance_progress_per_group(self):
+        """Test that the progress bar moves as each batch group finishes."""
+        batch = [("Q one?", "ctx"), ("Q two?", "ctx"), ("Q three?", "ctx")]
+        cache_key = self.client._answer_cache_key("Q one?", "ctx")
+        self.client._cache_put((cache_key, 0.7, 100), "cached answer")
+        pbar = MagicMock(n=0)
+
+        def fake_batch_generate(model, tokenizer, prompts, max_tokens):
+            return MagicMock(texts=["answer"] * len(prompts))
+
+        with patch('src.mlx_client.BATCH_GENERATE_AVAILABLE', True), \
+             patch('src.mlx_client.batch_generate', side_effect=fake_batch_generate, create=True):
+            await self.client.get_answers_batch(batch, 0.7, 100, pbar)
+
+        # The cached answer first, then one group of the two generated ones
+        assert [c.args for c in pbar.update.call_args_list] == [(1,), (2,)]
+
+    @pytest.mark.asyncio
+    async def test_batch_answers_fall_back_to_single_calls(self):
+        """Test that serial answering is used when batching is unavailable."""
+        batch = [("Q one?", "ctx one"), ("Q two?", "ctx two")]
+
+        with patch('src.mlx_client.BATCH_GENERATE_AVAILABLE', False), \
+             patch.object(self.client, 'get_answer_single', new_callable=AsyncMock) as mock_single:
+            mock_single.side_effect = ["first", "second"]
+            answers = await self.client.get_answers_batch(batch, 0.7, 100)
+
+        assert answers == ["first", "second"]
+        assert mock_single.call_count == 2
@@ -0,0 +1,170 @@
+"""Unit tests for the MLXModelManager."""
+
+import os
+
+import pytest
+
+from src.mlx_manager import MLXModelManager
+
+
+class TestMLXModelManagerSizes:
+    """Test cases for directory stats helpers."""
+
+    def setup_method(self):
+        """Set up test fixtures before each test method."""
+        self.manager = MLXModelManager()
+
+    def test_get_directory_stats_counts_nested_files(self, tmp_path):
+        """Test that files and their sizes in nested directories are summed."""
+        (tmp_path / "a.bin").write_bytes(b"x" * 10)
+        nested = tmp_path / "snapshots" / "rev"
+        nested.mkdir(parents=True)
+        (nested / "b.json").write_bytes(b"x" * 5)
+
+        assert self.manager._get_directory_stats(tmp_path) == (15, 2)
+
+    @pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+    def test_get_directory_stats_does_not_follow_symlinks(self, tmp_path):
+        """Test that snapshot symlinks to blobs are not counted as extra data."""
+        blobs = tmp_path / "blobs"
+        blobs.mkdir()
+        blob = blobs / "abc123"
+        blob.write_bytes(b"x" * 1000)
+        snapshot = tmp_path / "snapshots"
+        snapshot.mkdir()
+        link = snapshot / "model.safetensors"
+        link.symlink_to(blob)
+
+        size, file_count = self.manager._get_directory_stats(tmp_path)
+
+        assert size == 1000 + os.lstat(link).st_size
+        assert file_count == 2
+
+    def test_format_size_picks_unit(self):
+        """Test that sizes are formatted with the largest fitting unit."""
+        assert self.manager._format_size(0) == "0.0 B"
+        assert self.manager._format_size(1023) == "1023.0 B"
+        assert self.manager._format_size(1536) == "1.5 KB"
+        assert self.manager._format_size(5 * 1024 ** 3) == "5.0 GB"
+        assert self.manager._format_size(2048 * 1024 ** 4) == "2048.0 TB"
+
+
+class TestMLXModelManagerWeights:
+    """Test cases for detecting model weight files."""
+
+    def setup_method(self):
+        """Set up test fixtures before each test method."""
+        self.manager = MLXModelManager()
+
+    def test_has_model_weights_finds_nested_files(self, tmp_path):
+        """Test that weights inside snapshot directories are detected."""
+        nested = tmp_path / "snapshots" / "rev"
+        nested.mkdir(parents=True)
+        (nested / "config.json").write_text("{}")
+        (nested / "model.safetensors").write_bytes(b"")
+
+        assert self.manager._has_model_weights(tmp_path) is True
+
+    def test_has_model_weights_without_weights(self, tmp_path):
+        """Test that repos with only metadata are not treated as models."""
+        (tmp_path / "config.json").write_text("{}")
+        (tmp_path / "tokenizer.model").write_bytes(b"")
+
+        assert self.manager._has_model_weights(tmp_path) is False
+
+
+class TestMLXModelManagerSizeCache:
+    """Test cases for memoized directory sizes."""
+
+    def setup_method(self):
+        """Set up test fixtures before each test method."""
+        self.manager = MLXModelManager()
+
+    def test_cached_size_reused_while_unchanged(self, tmp_path, mocker):
+        """Test that an unchanged directory is not walked again."""
+        (tmp_path / "blobs").mkdir()
+        (tmp_path / "blobs" / "abc").write_bytes(b"x" * 10)
+        spy = mocker.spy(self.manager, "_get_directory_stats")
+
+        assert self.manager._get_cached_directory_stats(tmp_path) == (10, 1)
+        assert self.manager._get_cached_directory_stats(tmp_path) == (10, 1)
+        assert spy.call_count == 1
+
+    def test_cached_size_invalidated_by_new_blob(self, tmp_path):
+        """Test that adding a file under a subdirectory refreshes the size."""
+        blobs = tmp_path / "blobs"
+        blobs.mkdir()
+        (blobs / "abc").write_bytes(b"x" * 10)
+        assert self.manager._get_cached_directory_stats(tmp_path) == (10, 1)
+
+        (blobs / "def").write_bytes(b"x" * 5)
+        # Make sure the directory mtime visibly changes on coarse filesystems
+        stat = os.stat(blobs)
+        os.utime(blobs, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert self.manager._get_cached_directory_stats(tmp_path) == (15, 2)
+
+    def test_list_local_models_can_skip_sizes(self, tmp_path, mocker):
+        """Test that sizes are not computed when the caller doesn't need them."""
+        repo = tmp_path / "models--org--model"
+        repo.mkdir()
+        (repo / "model.safetensors").write_bytes(b"x")
+        mocker.patch("src.mlx_manager.MLX_AVAILABLE", True)
+        self.manager.cache_dir = tmp_path
+        spy = mocker.spy(self.manager, "_get_directory_stats")
+
+        models = self.manager.list_local_models(include_size=False)
+
+        assert models == [{"name": "org/model", "path": str(repo)}]
+        assert spy.call_count == 0
+
+    def test_get_model_info_uses_one_walk(self, tmp_path, mocker):
+        """Test that size and file count come from the same cached walk."""
+        repo = tmp_path / "models--org--model"
+        (repo / "blobs").mkdir(parents=True)
+        (repo / "blobs" / "abc").write_bytes(b"x" * 10)
+        (repo / "config.json").write_text("{}")
+        self.manager.cache_dir = tmp_path
+        spy = mocker.spy(self.manager, "_get_directory_stats")
+
+        info = self.manager.get_model_info("org/model")
+        self.manager.get_model_info("org/model")
+
+        assert info["file_count"] == 2
+        assert info["size"] == "12.0 B"
+        assert spy.call_count == 1
+
+
+class TestMLXModelManagerRemove:
+    """Test cases for removing cached models."""
+
+    def setup_method(self):
+        """Set up test fixtures before each test method."""
+        self.manager = MLXModelManager()
+
+    def test_remove_model_requires_confirmation(self, tmp_path, mocker):
+        """Test that nothing is deleted, and stdin is never read, without confirm."""
+        repo = tmp_path / "models--org--model"
+        repo.mkdir()
+        self.manager.cache_dir = tmp_path
+        mock_input = mocker.patch("builtins.input")
+
+        assert self.manager.remove_model("org/model") is False
+        assert repo.exists()
+        assert not mock_input.called
+
+    def test_remove_model_with_confirmation(self, tmp_path):
+        """Test that a confirmed removal deletes the model directory."""
+        repo = tmp_path / "models--org--model"
+        repo.mkdir()
+        (repo / "model.safetensors").write_bytes(b"x")
+        self.manager.cache_dir = tmp_path
+
+        assert self.manager.remove_model("org/model", confirm=True) is True
+        assert not repo.exists()
+
+    def test_remove_missing_model(self, tmp_path):
+        """Test that removing a model that isn't cached reports failure."""
+        self.manager.cache_dir = tmp_path
+
+        assert self.manager.remove_model("org/missing", confirm=True) is False
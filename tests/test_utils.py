@@ -9,6 +9,7 @@ import time
 from src.utils import (
     check_battery_status,
     pause_on_low_battery,
+    throttled_pause_on_low_battery,
     get_repo_urls_from_file,
 )
 
@@ -178,6 +179,21 @@ class TestBatteryManagement:
         assert mock_battery.call_count == 2
         assert mock_sleep.call_count == 1
 
+    @patch("src.utils._last_battery_check", None)
+    @patch("src.utils.time.monotonic")
+    @patch("src.utils.pause_on_low_battery")
+    def test_throttled_pause_checks_at_most_once_per_interval(
+        self, mock_pause, mock_monotonic
+    ):
+        """Test that battery checks are skipped until the poll interval passes."""
+        mock_monotonic.side_effect = [100.0, 102.0, 106.0, 106.0]
+
+        throttled_pause_on_low_battery()  # First call always checks
+        throttled_pause_on_low_battery()  # 2s later: skipped
+        throttled_pause_on_low_battery()  # 6s later: checks again
+
+        assert mock_pause.call_count == 2
+
 
 class TestRepoURLs:
     """Test cases for repository URL handling."""